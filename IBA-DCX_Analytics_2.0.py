@@ -2,7 +2,6 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 import matplotlib as mpl
 import os
 import time
@@ -10,25 +9,35 @@ import re
 import base64
 import tempfile
 import random
-import itertools
 import gc
+import html
 import networkx as nx
-import squarify
 import urllib.request
 import datetime
 import pytz
 import uuid
-from collections import Counter, defaultdict
-from wordcloud import WordCloud
 from transformers import pipeline
-from gensim import corpora
-from gensim.models import LdaModel
 import pyLDAvis.gensim as gensimvis
 import pyLDAvis
 import altair as alt
 import gspread
-from random import choice
 from google.oauth2.service_account import Credentials
+from dcx_metrics import REGISTRY, span
+from dcx_core import (
+    KEYWORD_COLUMNS_EN, DATASET_MAP, TEXT_COLUMNS, LDA_SAMPLE_SIZE,
+    clean_token_column, column_tokens, term_frequencies, treemap_data,
+    extract_image_links, network_slider_bounds, cooccurrence_graph, network_layout, frequency_colors,
+    NETWORK_TOP_K, BACKBONE_ALPHA, NETWORK_METRICS_BUDGET, reduce_network, network_metrics,
+    lda_inputs, train_lda, sentiment_inputs, ScoringPlan, summarize_sentiment, SentimentSampler, SENTIMENT_TARGET
+)
+from dcx_region import Region
+from dcx_inference import InferencePool
+from dcx_artifacts import ArtifactCache
+from dcx_search import parse_query
+from dcx_render import (
+    font_name, wordcloud_frequencies, wordcloud_png, treemap_figure, network_figure,
+    metric_colors, metric_sizes, figure_png
+)
 
 #---GOOGLETRANS API TRY----
 try:
@@ -50,6 +59,8 @@ def translate_texts(texts, target_lang):
     return translated
 
 
+REGISTRY.begin_rerun()
+
 # --- Bilingual UI Setup ---
 lang = st.sidebar.selectbox("🌐 Language / Idioma", ["English", "Español"], key="lang")
 
@@ -84,6 +95,24 @@ TRANSLATIONS = {
         {"English": "Reviews", "Español": "Reseñas"},
     "Average Review Length":
         {"English": "Average Review Length", "Español": "Longitud Promedio de Reseña"},
+    "Search reviews":
+        {"English": "Search reviews", "Español": "Buscar reseñas"},
+    "Words, word* or \"exact phrase\"":
+        {"English": "Words, word* or \"exact phrase\"", "Español": "Palabras, palabra* o \"frase exacta\""},
+    "Search all stores in this region":
+        {"English": "Search all stores in this region", "Español": "Buscar en todas las tiendas de la región"},
+    "{n} reviews found":
+        {"English": "{n} reviews found", "Español": "{n} reseñas encontradas"},
+    "Page":
+        {"English": "Page", "Español": "Página"},
+    "🔄 Check for new reviews":
+        {"English": "🔄 Check for new reviews", "Español": "🔄 Buscar reseñas nuevas"},
+    "Checking for new reviews...":
+        {"English": "Checking for new reviews...", "Español": "Buscando reseñas nuevas..."},
+    "New reviews for {n} stores":
+        {"English": "New reviews for {n} stores", "Español": "Reseñas nuevas en {n} tiendas"},
+    "No new reviews":
+        {"English": "No new reviews", "Español": "No hay reseñas nuevas"},
     "Top Reviews 🖼️":
         {"English": "Top Reviews 🖼️", "Español": "Reseñas Destacadas 🖼️"},
     "🔄 Look at other reviews":
@@ -92,6 +121,10 @@ TRANSLATIONS = {
         {"English": "Wordcloud", "Español": "Nube de Palabras"},
     "No text available":
         {"English": "No text available", "Español": "No hay texto disponible"},
+    "Full resolution":
+        {"English": "🖼️ Full resolution", "Español": "🖼️ Resolución completa"},
+    "Download PNG":
+        {"English": "⬇️ Download PNG", "Español": "⬇️ Descargar PNG"},
     "Treemap":
         {"English": "Treemap", "Español": "Treemap"},
     "No text available for {column}":
@@ -105,10 +138,45 @@ TRANSLATIONS = {
         {"English": "Setting the Word Filter Criteria", "Español": "Configurar el filtro de palabras"},
     "Minimum word frequency":
         {"English": "Minimum word frequency", "Español": "Frecuencia mínima de palabra"},
+    "Maximum number of words":
+        {"English": "Maximum number of words", "Español": "Número máximo de palabras"},
+    "Rank words by":
+        {"English": "Rank words by", "Español": "Ordenar palabras por"},
+    "Frequency":
+        {"English": "Frequency", "Español": "Frecuencia"},
+    "Connections":
+        {"English": "Connections", "Español": "Conexiones"},
+    "Link significance (α)":
+        {"English": "Link significance (α)", "Español": "Significancia de enlaces (α)"},
+    "all links":
+        {"English": "all links", "Español": "todos los enlaces"},
+    "Interactive chart":
+        {"English": "Interactive chart", "Español": "Gráfico interactivo"},
+    "Showing {nodes} of {total_nodes} words and {edges} of {total_edges} links":
+        {"English": "Showing {nodes} of {total_nodes} words and {edges} of {total_edges} links",
+         "Español": "Mostrando {nodes} de {total_nodes} palabras y {edges} de {total_edges} enlaces"},
     "No matching network found with current filter criteria.":
         {"English": "No matching network found with current filter criteria.", "Español": "No se encontró una red con los criterios de filtro actuales."},
     "Color Criteria":
         {"English": "Color Criteria", "Español": "Criterios de color"},
+    "Color by":
+        {"English": "Color by", "Español": "Colorear por"},
+    "Size by":
+        {"English": "Size by", "Español": "Tamaño por"},
+    "Word length":
+        {"English": "Word length", "Español": "Longitud de palabra"},
+    "Community":
+        {"English": "Community", "Español": "Comunidad"},
+    "Bridging (betweenness)":
+        {"English": "Bridging (betweenness)", "Español": "Intermediación"},
+    "Importance (PageRank)":
+        {"English": "Importance (PageRank)", "Español": "Importancia (PageRank)"},
+    "Keyword clusters and bridge words":
+        {"English": "Keyword clusters and bridge words", "Español": "Grupos de palabras y palabras puente"},
+    "Color shows {metric}: darker means higher.":
+        {"English": "Color shows {metric}: darker means higher.", "Español": "El color muestra {metric}: más oscuro significa más alto."},
+    "Each color is one keyword community.":
+        {"English": "Each color is one keyword community.", "Español": "Cada color es una comunidad de palabras."},
     "High Frequency words 30%":
         {"English": "High Frequency words 30%", "Español": "Palabras de alta frecuencia 30%"},
     "Low Frequency words 30%":
@@ -156,6 +224,26 @@ TRANSLATIONS = {
         {"English": "✅Region/Store Selected", "Español": "✅Región/Negocio Seleccionado"},
     "Region":
         {"English": "Region", "Español": "Región"},
+    "Fast estimate (sampled)":
+        {"English": "Fast estimate (sampled)", "Español": "Estimación rápida (muestreo)"},
+    "Target precision (± points)":
+        {"English": "Target precision (± points)", "Español": "Precisión objetivo (± puntos)"},
+    "Overall":
+        {"English": "Overall", "Español": "General"},
+    "Aspect":
+        {"English": "Aspect", "Español": "Aspecto"},
+    "Estimate":
+        {"English": "Estimate", "Español": "Estimación"},
+    "Regional average":
+        {"English": "Regional average", "Español": "Promedio regional"},
+    "Estimates from {scored} of {total} texts (95% confidence intervals).":
+        {"English": "Estimates from {scored} of {total} texts (95% confidence intervals).",
+         "Español": "Estimaciones a partir de {scored} de {total} textos (intervalos de confianza del 95%)."},
+    "{saved} of {total} texts repeated another and were scored once":
+        {"English": "{saved} of {total} texts repeated another and were scored once",
+         "Español": "{saved} de {total} textos repetían otro y se puntuaron una sola vez"},
+    "Continue to exact scores":
+        {"English": "Continue to exact scores", "Español": "Continuar hasta los puntajes exactos"},
     "Store":
         {"English": "Store", "Español": "Negocio"},
     "This DCX analysis tool is only permitted for use in the following cases:":
@@ -195,6 +283,24 @@ TRANSLATIONS = {
         {"English": "✅ Please select a feature", "Español": "✅ Selecciona una función"},
     "✅Region/Store Selection Finalized":
         {"English": "✅ Region/Store has been selected", "Español": "✅ Selección de Región/Negocio Confirmada"},
+    "🔍 Search store":
+        {"English": "🔍 Search store", "Español": "🔍 Buscar negocio"},
+    "Showing {shown} of {total} stores":
+        {"English": "Showing {shown} of {total} stores", "Español": "Mostrando {shown} de {total} negocios"},
+    "Similar stores":
+        {"English": "Similar stores", "Español": "Negocios similares"},
+    "Weight by keyword sentiment":
+        {"English": "Weight by keyword sentiment", "Español": "Ponderar por sentimiento de palabras clave"},
+    "No similar stores found.":
+        {"English": "No similar stores found.", "Español": "No se encontraron negocios similares."},
+    "Monthly Trends":
+        {"English": "Monthly Trends", "Español": "Tendencias Mensuales"},
+    "Period":
+        {"English": "Period", "Español": "Periodo"},
+    "Sentiment Trend":
+        {"English": "Sentiment Trend", "Español": "Tendencia de Sentimiento"},
+    "Top words":
+        {"English": "Top words", "Español": "Palabras principales"},
     "⚠️ Please select the region and store first, then press 'Confirm' to activate the functions.":
         {"English": "⚠️ Please select the region and store first, then press 'Confirm' to activate the functions.",
          "Español": "⚠️ Selecciona primero la región y el negocio y luego pulsa 'Confirmar' para activar las funciones."},
@@ -250,10 +356,6 @@ body, .stApp { background-color: white !important; color: black !important; }
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 os.environ["STREAMLIT_WATCHER_TYPE"] = "none"
 
-FONT_PATH = "./NanumGothic-Regular.ttf"
-font_prop = fm.FontProperties(fname=FONT_PATH)
-fm.fontManager.addfont(FONT_PATH)
-font_name = font_prop.get_name()
 mpl.rcParams['font.family'] = font_name
 mpl.rcParams['axes.unicode_minus'] = False
 plt.rcParams['font.family'] = font_name
@@ -261,16 +363,6 @@ plt.rcParams['axes.unicode_minus'] = False
 
 TIMEZONE = pytz.timezone('Asia/Seoul')
 
-# Dataset mapping
-KEYWORD_COLUMNS_KO = ['맛', '서비스', '가격', '위치', '분위기', '위생']
-KEYWORD_COLUMNS_EN = ['Taste', 'Service', 'Price', 'Location', 'Atmosphere', 'Hygiene']
-KEYWORD_ENGLISH_MAP = dict(zip(KEYWORD_COLUMNS_KO, KEYWORD_COLUMNS_EN))
-DATASET_MAP = {
-    'Pusan National University': 'IBA-DCX_Analytics_2.0_PNU.csv',
-    'Kyung Hee University': 'IBA-DCX_Analytics_2.0_KHU.csv',
-    'Jeju Island': 'IBA-DCX_Analytics_2.0_Jeju.csv'
-}
-
 # Location English Mapping
 LOCATION_ENGLISH_MAP = {
     'Pusan National University': 'Pusan National University',
@@ -283,45 +375,90 @@ LOCATION_ENGLISH_MAP = {
 
 @st.cache_resource
 def get_classifier():
-    return pipeline("sentiment-analysis", model="matthewburke/korean_sentiment")
-
-@st.cache_data
-def load_dataset(dataset_name: str) -> pd.DataFrame:
-    import gdown
-    file_ids = {
-        'IBA-DCX_Analytics_2.0_PNU.csv': '1jfMMwnXi5zUOGE6F34B-KjQvfH5jjKmu',
-        'IBA-DCX_Analytics_2.0_KHU.csv': '1pqbNRLg8SdsmnZgi9JnqkxjDp7VUPlb4',
-        'IBA-DCX_Analytics_2.0_Jeju.csv': '1OeB_VE4bWYCLFAI85ozT7DwiL8V1W7yR'
-    }
-    file_id = file_ids.get(dataset_name)
-    output = f".cache_{dataset_name}"
-    if not os.path.exists(output):
-        gdown.download(f'https://drive.google.com/uc?id={file_id}', output, quiet=True)
-    use_cols = ['Name', 'Content', 'Tokens', 'Image_Links'] + KEYWORD_COLUMNS_KO + ['review_sentences', 'Date']
-    df = pd.read_csv(output, usecols=use_cols)
-    # Rename Korean columns to English
-    df = df.rename(columns=KEYWORD_ENGLISH_MAP)
-    return df
+    REGISTRY.cache_miss("get_classifier")
+    with span("load_classifier"):
+        return pipeline("sentiment-analysis", model="matthewburke/korean_sentiment")
+
+# Multi-process scoring for large stores; off unless DCX_INFERENCE_WORKERS > 1
+INFERENCE_WORKERS = int(os.environ.get("DCX_INFERENCE_WORKERS", "0"))
+POOL_MIN_TEXTS = 2000
+
+@st.cache_resource
+def get_inference_pool():
+    # Workers are forked right away, before this process runs any inference
+    return InferencePool(get_classifier(), workers=INFERENCE_WORKERS,
+                         threads_per_worker=int(os.environ.get("DCX_INFERENCE_THREADS", "1"))).start()
+
+def get_scorer(classifier, n_texts):
+    if INFERENCE_WORKERS > 1 and n_texts >= POOL_MIN_TEXTS:
+        return get_inference_pool()
+    return classifier
+
+@st.cache_resource
+def start_metrics_server(port: int):
+    return REGISTRY.serve(port)
+
+# The region's reviews plus its catalog, similar-stores and search indexes and rollups,
+# shared by all sessions and refreshed in place by delta (see dcx_region)
+@st.cache_resource
+def get_region(dataset_name: str) -> Region:
+    REGISTRY.cache_miss("load_dataset")
+    return Region(dataset_name)
+
+def load_region(location):
+    REGISTRY.cache_request("load_dataset")
+    return get_region(DATASET_MAP[location])
+
+def selected_region():
+    return get_region(DATASET_MAP[st.session_state.get('selected_location')])
+
+def store_version(store):
+    """Changes only when the store receives new reviews, so caches keyed on it survive other stores' refreshes."""
+    return selected_region().fingerprint(store)
+
+# Tab outputs on disk, shared by all sessions and kept across restarts (see dcx_artifacts)
+ARTIFACTS = ArtifactCache()
+
+def artifact_key(tab, store, **params):
+    return ARTIFACTS.key(f"{selected_region().name}:{store_version(store)}", store, tab, **params)
+
+def store_artifact(tab, store, compute, **params):
+    return ARTIFACTS.get_or_compute(f"{selected_region().name}:{store_version(store)}", store, tab, compute,
+                                    **params)
+
+# Wordclouds are cached per (store, column): the shared word weights plus one PNG per tier
+@st.cache_data(max_entries=512)
+def wordcloud_words(dataset_name: str, store: str, version: str, column: str, _df_store: pd.DataFrame) -> dict:
+    REGISTRY.cache_miss("wordcloud_words")
+    return store_artifact("wordcloud_words", store,
+                          lambda: wordcloud_frequencies(' '.join(column_tokens(_df_store, column))), column=column)
+
+@st.cache_data(max_entries=1024)
+def wordcloud_tier(dataset_name: str, store: str, version: str, column: str, tier: str, _frequencies: dict) -> bytes:
+    REGISTRY.cache_miss(f"wordcloud_{tier}")
+    return store_artifact("wordcloud", store, lambda: wordcloud_png(_frequencies, tier), column=column, tier=tier)
+
+def cached_wordcloud(dataset_name, store, column, tier, frequencies):
+    REGISTRY.cache_request(f"wordcloud_{tier}")
+    return wordcloud_tier(dataset_name, store, store_version(store), column, tier, frequencies)
 
 @st.cache_resource
 def train_lda_model(corpus, _dictionary, num_topics=10):
-    return LdaModel(corpus, num_topics=num_topics, id2word=_dictionary, passes=5)
+    REGISTRY.cache_miss("train_lda_model")
+    return train_lda(corpus, _dictionary, num_topics)
 
 @st.cache_resource
 def get_lda_vis_data(_model, corpus, _dictionary):
-    return gensimvis.prepare(_model, corpus, _dictionary)
+    REGISTRY.cache_miss("get_lda_vis_data")
+    with span("lda_vis_prepare") as s:
+        s.items = len(corpus)
+        return gensimvis.prepare(_model, corpus, _dictionary)
 
 ###############################################
 # Here used to go the limitations of users
 ###############################################
 # Functions
 
-def compute_sentiment(text, classifier):
-    if not isinstance(text, str):
-        text = str(text)
-    result = classifier(text)
-    return result[0]['score'] if result[0]['label'] == 'LABEL_1' else 1 - result[0]['score']
-
 def render_title(location, store):
     st.title(f"{location} - {store}")
 
@@ -333,35 +470,6 @@ def clean_memory(keys):
     plt.close('all')
     gc.collect()
 
-def clean_tokens(text):
-    text = re.sub(r"[^\w\s]", "", text)  # Remove commas, periods, etc.
-    return text.split()
-
-# Stopwords definition (unchanged)
-stopwords = {
-    # Particles / Pronouns / Demonstratives
-    '이', '그', '저', '것', '거', '곳', '수', '좀', '처럼', '까지', '에도', '에도요', '이나', '라도',
-
-    # Conjunctions / Connectors
-    '그리고', '그래서', '그러나', '하지만', '또한', '즉', '결국', '때문에', '그래도',
-
-    # Predicates / Endings / Auxiliary verbs
-    '합니다', '해요', '했어요', '하네요', '하시네요', '하시던데요', '같아요', '있어요', '없어요',
-    '되네요', '되었어요', '보여요', '느껴져요', '하겠습니다', '되겠습니다', '있습니다', '없습니다',
-    '합니다', '이에요', '이라', '해서',
-
-    # Interjections / Review-specific expressions
-    'ㅎㅎ', 'ㅋㅋ', 'ㅠㅠ', '^^', '^^;;', '~', '~~', '!!!', '??', '!?', '?!', '...', '!!', '~!!', '~^^!!',
-
-    # Emphasis expressions
-    '아주', '정말', '진짜', '엄청', '매우', '완전', '너무', '굉장히', '많이', '많아요', '적당히', '넘',
-
-    # Others
-    '정도', '느낌', '같은', '니당', '네요', '있네요', '이네요', '이라서',
-    '해서요', '보니까', '봤어요', '먹었어요', '마셨어요', '갔어요', '봤습니다', '하는', '하게', '드네', '또시',
-    '이랑', '하고', '해도', '해도요', '때문에요', '이나요', '정도에요'
-}
-
 ###############################################
 # Modules
 
@@ -439,27 +547,68 @@ def render_usage_tab():
         </div>
         """, unsafe_allow_html=True)
 
+# Monthly trends (read from the rollup tables, not the raw reviews)
+def render_trend_section(df, store):
+    rollups = selected_region().rollups
+    trend = rollups.trend(store)
+    if len(trend) < 2:
+        return
+
+    st.markdown(f"### 📈 {T('Monthly Trends')}")
+    months = [str(m) for m in trend.index]
+    start, end = st.select_slider(T("Period"), options=months, value=(months[0], months[-1]), key="trend_window")
+    window = rollups.window(store, start, end)
+    trend = rollups.trend(store, start, end)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(T("reviews"), window['reviews'])
+    with col2:
+        st.metric(T("images"), window['images'])
+    with col3:
+        st.metric(T("Average Review Length"), f"{window['avg_length']:.1f}")
+
+    chart_data = trend.reset_index().assign(month=lambda d: d['month'].dt.to_timestamp())
+    counts = chart_data.melt('month', value_vars=['reviews', 'images'], var_name='series', value_name='count')
+    st.altair_chart(
+        alt.Chart(counts).mark_line(point=True).encode(
+            x=alt.X('month:T', title=None), y=alt.Y('count:Q', title=None), color=alt.Color('series:N', title=None)
+        ),
+        use_container_width=True
+    )
+
+    sentiment_columns = [c for c in trend.columns if c.startswith('sentiment_') and trend[c].notna().any()]
+    if sentiment_columns:
+        st.markdown(f"#### {T('Sentiment Trend')}")
+        sentiment = chart_data.melt('month', value_vars=sentiment_columns, var_name='aspect', value_name='score')
+        sentiment['aspect'] = sentiment['aspect'].str.replace('sentiment_', '').replace({'review_sentences': 'Total'})
+        st.altair_chart(
+            alt.Chart(sentiment.dropna()).mark_line(point=True).encode(
+                x=alt.X('month:T', title=None), y=alt.Y('score:Q', title=T('Points'), scale=alt.Scale(zero=False)),
+                color=alt.Color('aspect:N', title=None)
+            ),
+            use_container_width=True
+        )
+
+    top_terms = rollups.top_terms(store, start, end)
+    if len(top_terms):
+        st.caption(f"{T('Top words')}: " + ", ".join(f"{w} ({c})" for w, c in top_terms.items()))
+
 # Review loading
 def render_review_tab(df, store):
     st.header(f"{st.session_state.get('selected_location', '')} - {store}: {T('Review Summary and Images')}")
     df_store = df[df['Name'] == store]
-    df_store['Tokens'] = df_store['Tokens'].fillna('').map(str).map(clean_tokens)
-    image_links = df_store['Image_Links'].tolist()
     reviews = df_store['Content'].fillna('').astype(str).tolist()
-    image_pattern = r'https?://[\S]+\.(?:jpg|jpeg|png|gif)'
-    all_links, all_reviews = [], []
-    for idx, link_str in enumerate(image_links):
-        if isinstance(link_str, str):
-            links = re.findall(image_pattern, link_str)
-            all_links.extend(links)
-            all_reviews.extend([reviews[idx]] * len(links))
+    all_links, all_reviews = extract_image_links(df_store)
 
     # DEMO: Translate displayed reviews if not Korean UI
     # (You can choose 'en' for English, 'es' for Spanish)
     googletrans_langs = {"English": "en", "Español": "es"}
     display_reviews = all_reviews
     if lang in googletrans_langs and lang != "한국어":  # if not Korean UI
-        display_reviews = translate_texts(all_reviews, googletrans_langs[lang])
+        with span("translate_reviews") as s:
+            display_reviews = translate_texts(all_reviews, googletrans_langs[lang])
+            s.items = len(all_reviews)
 
     avg_length = np.mean([len(r) for r in reviews if isinstance(r, str)]) if reviews else 0
     st.markdown(f"### 📊 {T('Review Indicators')}")
@@ -471,6 +620,8 @@ def render_review_tab(df, store):
     with col3:
         st.metric(T("Average Review Length"), f"{avg_length:.1f}")
 
+    render_trend_section(df, store)
+
     st.markdown(f"### {T('Top Reviews 🖼️')}")
     NUM_CARDS = 6
     if 'review_indices' not in st.session_state:
@@ -500,31 +651,65 @@ def render_review_tab(df, store):
                 </div>
                 """, unsafe_allow_html=True)
 
-# Wordcloud
-# Define vivid color list
-VIVID_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#e31a1c", "#17becf"]
+    render_review_search(df, store)
+
+# Review search: one page of matching reviews at a time, looked up in the region's inverted index
+REVIEW_PAGE_SIZE = 10
+
+def highlight_terms(text, query):
+    terms, prefixes, _ = parse_query(query)
+    escaped = html.escape(str(text))
+    patterns = [re.escape(html.escape(t)) for t in terms] + [re.escape(html.escape(p)) + r"\w*" for p in prefixes]
+    if not patterns:
+        return escaped
+    return re.sub("|".join(sorted(patterns, key=len, reverse=True)), lambda m: f"<mark>{m.group(0)}</mark>",
+                  escaped, flags=re.IGNORECASE)
+
+def render_review_search(df, store):
+    st.markdown(f"### 🔎 {T('Search reviews')}")
+    reset_page = lambda: st.session_state.pop("review_page", None)
+    query = st.text_input(T('Words, word* or "exact phrase"'), key="review_query", on_change=reset_page)
+    all_stores = st.checkbox(T("Search all stores in this region"), key="review_search_all", on_change=reset_page)
+    if not query.strip():
+        return
 
-# Random color function
-def vivid_color_func(*args, **kwargs):
-    return choice(VIVID_COLORS)
+    index = selected_region().search
+    contents = df['Content']
+    rows = index.search(query, store=None if all_stores else store, texts=lambda r: contents.iloc[r].values)
+    st.caption(T("{n} reviews found").format(n=len(rows)))
+    if not len(rows):
+        return
+
+    pages = (len(rows) - 1) // REVIEW_PAGE_SIZE + 1
+    page = st.number_input(T("Page"), min_value=1, max_value=pages, value=1, key="review_page") if pages > 1 else 1
+    page_rows = rows[(page - 1) * REVIEW_PAGE_SIZE:page * REVIEW_PAGE_SIZE]
+    for _, review in df.iloc[page_rows][['Name', 'Date', 'Content']].iterrows():
+        meta = html.escape(f"{review['Name']} · {review['Date']}" if all_stores else str(review['Date']))
+        st.markdown(f"""
+        <div style="padding:12px; background-color:#f9f9f9; border-radius:10px;
+                    box-shadow:0 2px 4px rgba(0,0,0,0.08); margin-bottom:8px;">
+            <div style="font-size:12px; color:gray;">{meta}</div>
+            <p style="font-size:14px; color:#333; margin:4px 0 0 0;">{highlight_terms(review['Content'], query)}</p>
+        </div>
+        """, unsafe_allow_html=True)
 
 # Wordcloud tab rendering function
 def render_wordcloud_tab(df, store):
     st.header(f"{st.session_state.get('selected_location', '')} - {store}: {T('Wordcloud')}")
     df_store = df[df['Name'] == store]
-    df_store['Tokens'] = df_store['Tokens'].fillna('').map(str).map(clean_tokens)
 
-    columns_to_plot = ['Content'] + KEYWORD_COLUMNS_EN
+    dataset_name = DATASET_MAP[st.session_state.get('selected_location')]
 
     container = st.container()
     cols = container.columns(3)
 
-    for idx, column in enumerate(columns_to_plot):
+    # First pass: a small preview in every slot (skipped once this session has seen the display tier)
+    shown = st.session_state.setdefault('wordcloud_displayed', set())
+    slots = {}
+    for idx, column in enumerate(TEXT_COLUMNS):
         col = cols[idx % 3]
-        text = ' '.join(df_store[column].dropna().map(str))
-        tokens = text.split()
-        filtered_tokens = [t for t in tokens if t not in stopwords]
-        filtered_text = ' '.join(filtered_tokens)
+        REGISTRY.cache_request("wordcloud_words")
+        frequencies = wordcloud_words(dataset_name, store, store_version(store), column, df_store)
 
         with col:
             st.markdown(
@@ -532,24 +717,23 @@ def render_wordcloud_tab(df, store):
                 unsafe_allow_html=True
             )
 
-            if filtered_text.strip():
-                wordcloud = WordCloud(
-                    font_path=FONT_PATH,
-                    width=800,
-                    height=800,
-                    contour_width=1.8,
-                    contour_color='black',
-                    background_color='white',
-                    mode='RGB',
-                    color_func=vivid_color_func,
-                    collocations=False
-                ).generate(filtered_text)
-
-                fig, ax = plt.subplots(figsize=(5, 5), dpi=150)
-                ax.imshow(wordcloud, interpolation='nearest')
-                ax.axis('off')
-                st.pyplot(fig)
-                plt.close(fig)
+            if frequencies:
+                slot = st.empty()
+                key = (dataset_name, store, column)
+                if key not in shown:
+                    slot.image(cached_wordcloud(dataset_name, store, column, 'preview', frequencies),
+                               use_container_width=True)
+                slots[column] = (slot, frequencies)
+
+                # Full resolution only on request, for the download
+                if st.session_state.get(f"wordcloud_full_{store}_{column}") or st.button(T("Full resolution"), key=f"wordcloud_full_btn_{column}"):
+                    st.session_state[f"wordcloud_full_{store}_{column}"] = True
+                    st.download_button(
+                        T("Download PNG"),
+                        cached_wordcloud(dataset_name, store, column, 'full', frequencies),
+                        file_name=f"wordcloud_{store}_{column}.png", mime="image/png",
+                        key=f"wordcloud_download_{column}"
+                    )
             else:
                 st.markdown(f"""
                 <div style="padding:10px; text-align:center; background-color:#f9f9f9;
@@ -559,41 +743,37 @@ def render_wordcloud_tab(df, store):
                 </div>
                 """, unsafe_allow_html=True)
 
+    # Second pass: swap each preview for the display tier as it becomes ready
+    for column, (slot, frequencies) in slots.items():
+        with span("wordcloud_render"):
+            slot.image(cached_wordcloud(dataset_name, store, column, 'display', frequencies),
+                       use_container_width=True)
+        shown.add((dataset_name, store, column))
+
 # Treemap
 def render_treemap_tab(df, store):
     st.header(f"{st.session_state.get('selected_location', '')} - {store}: {T('Treemap')}")
     df_store = df[df['Name'] == store]
-    df_store['Tokens'] = df_store['Tokens'].fillna('').map(str).map(clean_tokens)
 
-    columns_to_plot = ['Content'] + KEYWORD_COLUMNS_EN
     container = st.container()
     cols = container.columns(3)
 
-    for idx, column in enumerate(columns_to_plot):
-        col = cols[idx % 3]
-        text = ' '.join(df_store[column].dropna().map(str))
+    def treemap_png(column):
+        word_count = term_frequencies(df_store, column)
+        if not word_count:
+            return b''  # cached too, so empty columns are not recounted
+        with span("treemap_render"):
+            return figure_png(treemap_figure(*treemap_data(word_count)))
 
-        tokens = text.split()
-        filtered_tokens = [t for t in tokens if t not in stopwords]
-        word_count = Counter(filtered_tokens)
+    for idx, column in enumerate(TEXT_COLUMNS):
+        col = cols[idx % 3]
+        png = store_artifact("treemap", store, lambda: treemap_png(column), column=column)
 
         with col:
             st.markdown(f"<div style='text-align:center; font-weight:bold; font-size:16px; margin-bottom:5px;'>{column}</div>", unsafe_allow_html=True)
 
-            if filtered_tokens and len(word_count) > 0:
-                most_common = word_count.most_common(10)
-                sizes = [count for _, count in most_common]
-                labels = [f"{word} ({count})" for word, count in most_common]
-
-                cmap = plt.cm.get_cmap("Blues")
-                normed_sizes = [s / max(sizes) for s in sizes]
-                colors = [cmap(0.3 + 0.7 * s) for s in normed_sizes]
-
-                fig, ax = plt.subplots(figsize=(4, 4))
-                squarify.plot(sizes=sizes, label=labels, color=colors, alpha=0.85, ax=ax, text_kwargs={'fontsize':10})
-                ax.axis('off')
-                st.pyplot(fig)
-                plt.close(fig)
+            if png:
+                st.image(png, use_container_width=True)
             else:
                 st.markdown(f"""
                 <div style="padding:20px; text-align:center; background-color:#f9f9f9;
@@ -618,6 +798,79 @@ def render_treemap_tab(df, store):
             - **Light colors** represent words with lower frequency.
             """)
 
+# Co-occurrence graph and its metrics, cached per (store, min_freq); display controls only reduce/draw
+@st.cache_resource(max_entries=64)
+def get_network(dataset_name: str, store: str, version: str, min_freq: int, _df_store: pd.DataFrame):
+    REGISTRY.cache_miss("get_network")
+    return cooccurrence_graph(clean_token_column(_df_store['Tokens']), min_freq)
+
+@st.cache_resource(max_entries=64)
+def get_network_metrics(dataset_name: str, store: str, version: str, min_freq: int, _G: nx.Graph):
+    REGISTRY.cache_miss("get_network_metrics")
+    return network_metrics(_G, budget_seconds=NETWORK_METRICS_BUDGET)
+
+def network_view(dataset_name, store, df_store, min_freq, top_k, alpha, rank_by, color_by, size_by):
+    """Reduced graph, layout, node colors/sizes and metrics for one set of network controls."""
+    REGISTRY.cache_request("get_network")
+    version = store_version(store)
+    full_graph, word_freq = get_network(dataset_name, store, version, min_freq, df_store)
+    G = reduce_network(full_graph, word_freq, top_k, alpha, rank_by)
+    view = {'graph': G, 'total_nodes': full_graph.number_of_nodes(), 'total_edges': full_graph.number_of_edges(),
+            'word_freq': {n: word_freq.get(n, 0) for n in G.nodes()}, 'metrics': None, 'info': None}
+    if G.number_of_nodes() == 0:
+        return view
+
+    # Metrics come from the full graph, so they do not shift with the display controls
+    if {color_by, size_by} & {'community', 'betweenness', 'pagerank'}:
+        REGISTRY.cache_request("get_network_metrics")
+        metrics, view['info'] = get_network_metrics(dataset_name, store, version, min_freq, full_graph)
+        view['metrics'] = metrics.reindex(list(G.nodes()))
+    metrics = view['metrics']
+
+    view['pos'] = network_layout(G)
+    if color_by == 'frequency':
+        view['colors'] = frequency_colors(G, word_freq)
+    else:
+        view['colors'] = metric_colors(metrics[color_by], categorical=color_by == 'community')
+    if size_by == 'length':
+        view['sizes'] = [1000 + len(n) * 250 for n in G.nodes()]
+    elif size_by == 'frequency':
+        view['sizes'] = metric_sizes(word_freq.get(n, 0) for n in G.nodes())
+    else:
+        view['sizes'] = metric_sizes(metrics[size_by])
+    return view
+
+NETWORK_METRIC_LABELS = {
+    'frequency': "Frequency",
+    'community': "Community",
+    'betweenness': "Bridging (betweenness)",
+    'pagerank': "Importance (PageRank)",
+    'length': "Word length",
+}
+
+# Interactive network: only the reduced graph's nodes and edges are sent to the browser
+def network_chart(G, pos, node_colors, word_freq, node_sizes):
+    nodes = pd.DataFrame([
+        {'word': n, 'x': pos[n][0], 'y': pos[n][1], 'frequency': word_freq.get(n, 0), 'color': c, 'size': size}
+        for n, c, size in zip(G.nodes(), node_colors, node_sizes)
+    ])
+    edges = pd.DataFrame([
+        {'x': pos[u][0], 'y': pos[u][1], 'x2': pos[v][0], 'y2': pos[v][1], 'weight': w}
+        for u, v, w in G.edges(data='weight')
+    ])
+    axis = alt.Axis(labels=False, ticks=False, grid=False, title=None, domain=False)
+    links = alt.Chart(edges).mark_rule(color='lightgray', opacity=0.6).encode(
+        x=alt.X('x:Q', axis=axis), y=alt.Y('y:Q', axis=axis), x2='x2:Q', y2='y2:Q',
+        strokeWidth=alt.StrokeWidth('weight:Q', scale=alt.Scale(range=[0.5, 4]), legend=None)
+    )
+    points = alt.Chart(nodes).mark_circle(opacity=0.9).encode(
+        x='x:Q', y='y:Q', color=alt.Color('color:N', scale=None),
+        size=alt.Size('size:Q', scale=alt.Scale(range=[100, 1500]), legend=None),
+        tooltip=['word:N', 'frequency:Q']
+    )
+    labels = alt.Chart(nodes).mark_text(font=font_name, fontSize=12).encode(x='x:Q', y='y:Q', text='word:N')
+    return (links + points + labels).properties(height=600).interactive()
+
 # Network analysis
 def render_network_tab(df, store):
     st.header(f"{st.session_state.get('selected_location', '')} - {store}: {T('Network Analysis')}")
@@ -627,17 +880,10 @@ def render_network_tab(df, store):
         st.warning(T("Insufficient reviews to perform network analysis."))
         return
 
-    def clean_tokens(text):
-        text = re.sub(r"[^\w\s]", "", text)
-        return text.split()
-    
-    df_store['Tokens'] = df_store['Tokens'].fillna('').map(str).map(clean_tokens)
+    dataset_name = DATASET_MAP[st.session_state.get('selected_location')]
 
     st.subheader(T("Setting the Word Filter Criteria"))
-    total_reviews = len(df_store)
-    min_value = max(1, total_reviews // 20)
-    max_value = max(2, total_reviews // 10)
-    default_value = (min_value + max_value) // 2
+    min_value, max_value, default_value = network_slider_bounds(len(df_store))
 
     min_freq = st.slider(
         T("Minimum word frequency"),
@@ -646,61 +892,61 @@ def render_network_tab(df, store):
         value=default_value
     )
 
-    word_freq = Counter(itertools.chain(*df_store['Tokens']))
-    filtered_words = {w for w, c in word_freq.items() if c >= min_freq}
-
-    df_store['Filtered_Tokens'] = df_store['Tokens'].apply(
-        lambda tokens: [w for w in tokens if w in filtered_words and w not in stopwords and len(w) > 1]
-    )
-
-    co_occurrence = defaultdict(int)
-    for tokens in df_store['Filtered_Tokens']:
-        for pair in itertools.combinations(set(tokens), 2):
-            co_occurrence[tuple(sorted(pair))] += 1
-
-    G = nx.Graph()
-    for (w1, w2), freq in co_occurrence.items():
-        G.add_edge(w1, w2, weight=freq)
-
-    G.remove_nodes_from(list(nx.isolates(G)))
+    # Reduce before layout: top-K words, then the significant co-occurrence backbone
+    col_k, col_by, col_alpha = st.columns(3)
+    top_k = col_k.slider(T("Maximum number of words"), min_value=10, max_value=200, value=NETWORK_TOP_K, step=10)
+    rank_by = col_by.radio(T("Rank words by"), ['frequency', 'degree'], horizontal=True,
+                           format_func=lambda by: T("Frequency") if by == 'frequency' else T("Connections"))
+    alpha = col_alpha.select_slider(T("Link significance (α)"), options=[0.001, 0.01, 0.05, 0.1, 0.2, 1.0],
+                                    value=BACKBONE_ALPHA, format_func=lambda a: T("all links") if a >= 1 else f"{a:g}")
+    col_color, col_size = st.columns(2)
+    color_by = col_color.selectbox(T("Color by"), ['frequency', 'community', 'betweenness', 'pagerank'],
+                                   format_func=lambda m: T(NETWORK_METRIC_LABELS[m]))
+    size_by = col_size.selectbox(T("Size by"), ['length', 'frequency', 'betweenness', 'pagerank'],
+                                 format_func=lambda m: T(NETWORK_METRIC_LABELS[m]))
+    interactive = st.toggle(T("Interactive chart"))
+
+    params = dict(min_freq=min_freq, top_k=top_k, alpha=alpha, rank_by=rank_by, color_by=color_by, size_by=size_by)
+    view = store_artifact("network", store,
+                          lambda: network_view(dataset_name, store, df_store, **params), **params)
+    G, metrics, info = view['graph'], view['metrics'], view['info']
+    REGISTRY.observe("dcx_graph_nodes", G.number_of_nodes())
+    REGISTRY.observe("dcx_graph_edges", G.number_of_edges())
 
     if G.number_of_nodes() == 0:
         st.warning(T("No matching network found with current filter criteria."))
         return
 
-    pos = nx.spring_layout(G, k=0.5, seed=42)
-    degree_centrality = nx.degree_centrality(G)
-
-    freq_dict = {node: word_freq.get(node, 0) for node in G.nodes()}
-    freq_values = list(freq_dict.values())
-    upper_thresh = np.percentile(freq_values, 70)
-    lower_thresh = np.percentile(freq_values, 30)
-
-    def get_color(freq):
-        if freq >= upper_thresh:
-            return 'green'
-        elif freq <= lower_thresh:
-            return 'crimson'
-        else:
-            return 'skyblue'
-
-    node_colors = [get_color(freq_dict[n]) for n in G.nodes()]
-
-    fig, ax = plt.subplots(figsize=(8, 7))
-    fig.subplots_adjust(top=0.88, bottom=0.15)
-    node_sizes = [1000 + len(n) * 250 for n in G.nodes()]
-    
-    nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=node_sizes, ax=ax)
-    nx.draw_networkx_edges(G, pos, edge_color='lightgray', ax=ax, alpha=0.5)
-    nx.draw_networkx_labels(G, pos, font_size=12, font_family=font_prop.get_name(), ax=ax)
-    
-    ax.set_title(f"{store} - {T('Network Analysis')}", fontproperties=font_prop, fontsize=16, pad=12)
-    ax.axis('off')
-    st.pyplot(fig)
-    plt.close(fig)
+    if interactive:
+        st.altair_chart(network_chart(G, view['pos'], view['colors'], view['word_freq'], view['sizes']),
+                        use_container_width=True)
+    else:
+        title = f"{store} - {T('Network Analysis')}"
+        st.image(store_artifact(
+            "network_png", store,
+            lambda: figure_png(network_figure(G, view['pos'], view['colors'], title, view['sizes'])),
+            title=title, **params
+        ))
+    st.caption(T("Showing {nodes} of {total_nodes} words and {edges} of {total_edges} links").format(
+        nodes=G.number_of_nodes(), total_nodes=view['total_nodes'],
+        edges=G.number_of_edges(), total_edges=view['total_edges']))
+
+    if info is not None:
+        with st.expander(f"🧭 {T('Keyword clusters and bridge words')}"):
+            clusters = (metrics.reset_index(names='word').sort_values('pagerank', ascending=False)
+                        .groupby('community', sort=True)['word'].apply(lambda words: ', '.join(words[:8])))
+            st.dataframe(clusters.rename(T("Community")), use_container_width=True)
+            bridges = metrics['betweenness'].nlargest(10).rename(T("Bridging (betweenness)"))
+            st.dataframe(bridges, use_container_width=True)
+            st.caption(f"betweenness: {info['betweenness']}, communities: {info['communities']}, "
+                       f"{info['seconds']:.2f}s")
 
     with st.expander(f"🌈 {T('Color Criteria')}"):
-        if lang == "Español":
+        if color_by == 'community':
+            st.markdown(T("Each color is one keyword community."))
+        elif color_by != 'frequency':
+            st.markdown(T("Color shows {metric}: darker means higher.").format(metric=T(NETWORK_METRIC_LABELS[color_by])))
+        elif lang == "Español":
             st.markdown(f"""
             - 🟢 **Verde**: {T("High Frequency words 30%")}
             - 🔴 **Rojo**: {T("Low Frequency words 30%")}
@@ -717,31 +963,51 @@ def render_network_tab(df, store):
 def render_topic_tab(df, store):
     st.header(f"{st.session_state.get('selected_location', '')} - {store}: {T('Topic Modeling')}")
     df_store = df[df['Name'] == store]
-    df_store['Tokens'] = df_store['Tokens'].fillna('').map(str).map(clean_tokens)
     if len(df_store) < 50:
         st.warning(T("Not enough reviews to run topic modeling."))
         return
 
-    df_store['Tokens'] = df_store['Tokens'].fillna('').map(str).map(str.split)
-    if len(df_store) > 300:
-        df_store = df_store.sample(300, random_state=42)
+    # A store that was already modeled is served straight from the artifact cache
+    lda_params = dict(num_topics=10, sample_size=LDA_SAMPLE_SIZE)
+    lda_key = artifact_key("topics", store, **lda_params)
+    html_content = ARTIFACTS.get(lda_key, "topics")
 
-    dictionary = corpora.Dictionary(df_store['Tokens'])
-    corpus = [dictionary.doc2bow(text) for text in df_store['Tokens']]
-
-    if st.button(T("Execute Topic Modeling")):
-        lda_model = train_lda_model(corpus, dictionary)
+    if html_content is None and st.button(T("Execute Topic Modeling")):
+        dictionary, corpus = lda_inputs(df_store)
+        REGISTRY.cache_request("train_lda_model")
+        lda_model = train_lda_model(corpus, dictionary, lda_params['num_topics'])
+        REGISTRY.cache_request("get_lda_vis_data")
         vis_data = get_lda_vis_data(lda_model, corpus, dictionary)
-        with tempfile.NamedTemporaryFile("w+", delete=False, suffix=".html") as f:
+        with span("lda_save_html"), tempfile.NamedTemporaryFile("w+", delete=False, suffix=".html") as f:
             pyLDAvis.save_html(vis_data, f.name)
             html_path = f.name
         with open(html_path, "r", encoding="utf-8") as f:
             html_content = f.read()
-        b64 = base64.b64encode(html_content.encode()).decode()
-        st.markdown(f'<a href="data:text/html;base64,{b64}" download="lda_result.html">{T("Download LDA Result HTML")}</a>', unsafe_allow_html=True)
+        os.remove(html_path)
+        ARTIFACTS.put(lda_key, html_content)
         del lda_model, vis_data, corpus, dictionary
         gc.collect()
 
+    if html_content is not None:
+        b64 = base64.b64encode(html_content.encode()).decode()
+        st.markdown(f'<a href="data:text/html;base64,{b64}" download="lda_result.html">{T("Download LDA Result HTML")}</a>', unsafe_allow_html=True)
+
+# Sampled sentiment estimates with 95% intervals, next to the regional averages
+def render_sentiment_estimates(slot, sampler, region_stats):
+    estimates = sampler.estimates()
+    rows = [('total', T("Overall"), *estimates['total'])]
+    rows += [(col, T(col), *estimates['keywords'][col]) for col in KEYWORD_COLUMNS_EN]
+    table = pd.DataFrame([
+        {
+            T("Aspect"): label,
+            T("Estimate"): "-" if est is None else (f"{est:.1f}" if not half else f"{est:.1f} ± {half:.1f}"),
+            T("Regional average"): region_stats.get(key),
+            T("points difference"): None if est is None or region_stats.get(key) is None else est - region_stats[key],
+        }
+        for key, label, est, half in rows
+    ])
+    slot.dataframe(table, use_container_width=True, hide_index=True)
+
 # Sentiment analysis
 def render_sentiment_dashboard(df, store, classifier):
     region_avg_scores = {
@@ -780,42 +1046,70 @@ def render_sentiment_dashboard(df, store, classifier):
         st.warning(T("Insufficient reviews to perform sentiment analysis."))
         return
 
-    sentiment_key = f"sentiment_scores_{store}"
+    # Keyed on the store's version, so scores from before a refresh are not shown for new reviews
+    sentiment_key = f"sentiment_scores_{store}_{store_version(store)}"
+    sentiment_artifact = artifact_key("sentiment", store, model="matthewburke/korean_sentiment")
+
+    if sentiment_key not in st.session_state:
+        cached = ARTIFACTS.get(sentiment_artifact, "sentiment")
+        if cached is not None:
+            st.session_state[sentiment_key] = cached
+
+    def finish(column_scores, calls_saved, total_texts):
+        st.session_state[f"{sentiment_key}_saved"] = (calls_saved, total_texts)
+        region = selected_region()
+        region.rollups.set_sentiment(store, df_store, column_scores)
+        region.save_rollups()
+        st.session_state[sentiment_key] = summarize_sentiment(column_scores)
+        ARTIFACTS.put(sentiment_artifact, st.session_state[sentiment_key])
+        region.similar.set_aspect_scores({store: st.session_state[sentiment_key]['keywords']})
 
     if sentiment_key not in st.session_state:
-        if st.button(T("🧠 Start Customer Satisfaction Analysis")):
-            texts = df_store['review_sentences'].dropna().astype(str).tolist()
-            keyword_inputs = {col: df_store[col].dropna().astype(str).tolist() for col in KEYWORD_COLUMNS_EN}
-            total_steps = len(texts) + sum(len(v) for v in keyword_inputs.values())
-            completed_steps = 0
+        sampler_key = f"sentiment_sampler_{store}_{store_version(store)}"
+        fast = st.toggle(T("Fast estimate (sampled)"), value=True, key="sentiment_fast")
+        target = st.select_slider(T("Target precision (± points)"), options=[0.5, 1.0, 2.0, 3.0, 5.0], value=SENTIMENT_TARGET,
+                                  key="sentiment_target") if fast else None
+        started = st.button(T("🧠 Start Customer Satisfaction Analysis"))
+        sampler = st.session_state.get(sampler_key)
+
+        if fast and (started or sampler is not None):
+            # Sampled estimates first, refined in rounds until every interval is within the target
+            if sampler is None:
+                sampler = st.session_state[sampler_key] = SentimentSampler(df_store)
+            scorer = get_scorer(classifier, sampler.total_texts)
+            estimates_slot = st.empty()
+            progress_bar = st.progress(0.0)
+            region_stats = region_avg_scores.get(st.session_state.get('selected_location', ''), {})
+            while True:
+                render_sentiment_estimates(estimates_slot, sampler, region_stats)
+                progress_bar.progress(sampler.scored_texts / max(1, sampler.total_texts))
+                if sampler.converged(target) or not sampler.refine(scorer, target):
+                    break
+
+            if not sampler.complete():
+                st.caption(T("Estimates from {scored} of {total} texts (95% confidence intervals).").format(
+                    scored=sampler.scored_texts, total=sampler.total_texts))
+                if not st.button(T("Continue to exact scores")):
+                    return
+                # Already-scored texts are kept; only the rest goes through the classifier
+                while sampler.refine(scorer):
+                    render_sentiment_estimates(estimates_slot, sampler, region_stats)
+                    progress_bar.progress(sampler.scored_texts / max(1, sampler.total_texts))
+            finish(sampler.column_scores(), sampler.calls_saved, sampler.total_texts)
+            del st.session_state[sampler_key]
+            estimates_slot.empty()
+            progress_bar.empty()
+        elif started:
+            # Total and keyword texts go through the classifier once per distinct text
+            plan = ScoringPlan(sentiment_inputs(df_store))
+            total_steps = max(1, len(plan))
             progress_bar = st.progress(0)
 
-            total_scores = []
-            for text in texts:
-                result = classifier(text)[0]
-                score = result['score'] if result['label'] == 'LABEL_1' else 1 - result['score']
-                total_scores.append(score)
-                completed_steps += 1
-                progress_bar.progress(completed_steps / total_steps)
-
-            keyword_scores = {}
-            for col, col_texts in keyword_inputs.items():
-                if col_texts:
-                    scores = []
-                    for text in col_texts:
-                        result = classifier(text)[0]
-                        score = result['score'] if result['label'] == 'LABEL_1' else 1 - result['score']
-                        scores.append(score)
-                        completed_steps += 1
-                        progress_bar.progress(completed_steps / total_steps)
-                    keyword_scores[col] = np.mean(scores) * 100
-                else:
-                    keyword_scores[col] = None
-
-            st.session_state[sentiment_key] = {
-                'total': np.mean(total_scores) * 100,
-                'keywords': keyword_scores
-            }
+            column_scores = plan.score(
+                get_scorer(classifier, total_steps),
+                progress=lambda done: progress_bar.progress(min(1.0, done / total_steps))
+            )
+            finish(column_scores, plan.calls_saved, plan.total_texts)
         else:
             st.info(T("Click the button above to start the analysis."))
             return
@@ -824,6 +1118,9 @@ def render_sentiment_dashboard(df, store, classifier):
     region_name = st.session_state.get('selected_location', '')
     region_stats = region_avg_scores.get(region_name, {})
     sentiment_data = st.session_state[sentiment_key]
+    if f"{sentiment_key}_saved" in st.session_state:
+        saved, total = st.session_state[f"{sentiment_key}_saved"]
+        st.caption(T("{saved} of {total} texts repeated another and were scored once").format(saved=saved, total=total))
 
     # Overall score comparison
     st.subheader(T("🔎 Overall Sentiment Score Comparison"))
@@ -916,6 +1213,7 @@ def render_sentiment_dashboard(df, store, classifier):
 # UI
 
 # Sidebar
+STORE_SEARCH_LIMIT = 50
 st.sidebar.image("DCX_Tool.png", use_container_width=True)
 st.sidebar.title(T("Select Region and Store"))
 
@@ -924,10 +1222,20 @@ if 'location_locked' not in st.session_state:
 
 if not st.session_state['location_locked']:
     location = st.sidebar.selectbox(T("Please select a region"), [''] + list(DATASET_MAP.keys()), key="loc")
+    store = ''
     if location:
-        df = load_dataset(DATASET_MAP[location])
-        stores = df['Name'].value_counts().index.tolist()
-        store = st.sidebar.selectbox(T("Please select a store"), [''] + stores, key="store")
+        region = load_region(location)
+        df = region.df
+        catalog = region.catalog
+        query = st.sidebar.text_input(T("🔍 Search store"), key="store_query")
+        with span("store_search") as s:
+            matches = catalog.search(query, limit=STORE_SEARCH_LIMIT)
+            s.items = len(matches)
+        store = st.sidebar.selectbox(
+            T("Please select a store"), [''] + matches, key="store",
+            format_func=lambda name: f"{name} ({catalog.info(name)['reviews']})" if name else ''
+        )
+        st.sidebar.caption(T("Showing {shown} of {total} stores").format(shown=len(matches), total=len(catalog)))
         if store and st.sidebar.button(T("✅Region/Store Selection Finalized")):
             st.session_state.update({
                 'location_locked': True,
@@ -938,7 +1246,30 @@ else:
     location = st.session_state.get('selected_location')
     store = st.session_state.get('selected_store')
     st.sidebar.markdown(f"🔒 {T('Region')}: {location}\n\n🔒 {T('Store')}: {store}")
-    df = load_dataset(DATASET_MAP[location])
+    region = load_region(location)
+    df = region.df
+
+# Delta refresh (admin): only new rows are read, and only stores that received reviews lose their caches
+if location and os.environ.get("DCX_ADMIN") == "1" and st.sidebar.button(T("🔄 Check for new reviews")):
+    with st.spinner(T("Checking for new reviews...")):
+        changed = region.refresh()
+    st.toast(T("New reviews for {n} stores").format(n=len(changed)) if changed else T("No new reviews"))
+    if changed:
+        st.rerun()
+
+# Similar stores (next to the selected store)
+def render_similar_stores(location, store, k=5):
+    index = get_region(DATASET_MAP[location]).similar
+    with st.sidebar.expander(f"🏪 {T('Similar stores')}"):
+        weight = 1.0 if st.checkbox(T("Weight by keyword sentiment"), key="similar_weighted") else 0.0
+        neighbours = index.similar(store, k=k, sentiment_weight=weight)
+        if not neighbours:
+            st.caption(T("No similar stores found."))
+        for name, similarity in neighbours:
+            st.markdown(f"- {name} · {similarity:.0%}")
+
+if location and store:
+    render_similar_stores(location, store)
 
 # Usage rules (bilingual markdown)
 if lang == "Español":
@@ -1003,7 +1334,7 @@ st.sidebar.markdown(f"""
 TABS = [
     T("How to Use"),
     T("Photos & Reviews"),
-    T("WordCloud"),
+    T("Word Cloud"),
     T("Treemap"),
     T("Network Analysis"),
     T("Topic Modeling"),
@@ -1027,7 +1358,7 @@ div[data-testid="stMarkdownContainer"] p {
 """, unsafe_allow_html=True)
 
 if st.session_state.get("location_locked", False):
-    selected_tab = st.selectbox(T("✅ Please select a feature"), TABS)
+    selected_tab = st.selectbox(T("✅ Please select a feature"), TABS, key="feature")
     if st.session_state['current_tab'] != selected_tab:
         keys_to_clear = [
             key for key in st.session_state.keys()
@@ -1062,6 +1393,28 @@ tab_map = {
     T("Customer Satisfaction Analysis"): lambda: render_sentiment_dashboard(df, store, get_classifier()),
 }
 
+if INFERENCE_WORKERS > 1 and selected_tab == T("Customer Satisfaction Analysis"):
+    get_inference_pool()
+
+def render_metrics_panel():
+    breakdown = REGISTRY.rerun_breakdown()
+    with st.sidebar.expander("⏱️ Rerun timings (admin)"):
+        if breakdown:
+            st.dataframe(pd.DataFrame(breakdown, columns=['Stage', 'Seconds', 'Items']),
+                         use_container_width=True, hide_index=True)
+        else:
+            st.caption("No timed stages in this rerun.")
+        rerun_seconds = REGISTRY.rerun_seconds()
+        if rerun_seconds is not None:
+            st.caption(f"Total rerun: {rerun_seconds:.3f}s")
+        for cache in ('load_dataset', 'region_catalog', 'region_rollups', 'region_similar', 'region_search', 'get_classifier', 'get_network', 'get_network_metrics', 'wordcloud_words',
+                      'wordcloud_preview', 'wordcloud_display', 'wordcloud_full', 'train_lda_model', 'get_lda_vis_data',
+                      'artifact_wordcloud', 'artifact_treemap', 'artifact_network', 'artifact_network_png',
+                      'artifact_topics', 'artifact_sentiment'):
+            hit_rate = REGISTRY.cache_hit_rate(cache)
+            if hit_rate is not None:
+                st.caption(f"{cache} cache hit rate: {hit_rate:.0%}")
+
 if selected_tab in tab_map:
     # Photos & Reviews, Word Cloud, Treemap, Network Analysis, Topic Modeling take df, store
     if selected_tab in [T("Photos & Reviews"), T("Word Cloud"), T("Treemap"), T("Network Analysis"), T("Topic Modeling")]:
@@ -1069,5 +1422,13 @@ if selected_tab in tab_map:
     elif selected_tab == T("How to Use"):
         tab_map[selected_tab]()
     else:  # Sentiment
+        REGISTRY.cache_request("get_classifier")
         tab_map[selected_tab]()
 
+# Metrics: file/endpoint export and optional admin breakdown
+if os.environ.get("DCX_METRICS_PORT"):
+    start_metrics_server(int(os.environ["DCX_METRICS_PORT"]))
+REGISTRY.write()
+if os.environ.get("DCX_ADMIN") == "1":
+    render_metrics_panel()
+
@@ -0,0 +1,139 @@
+"""Headless microbenchmarks of each tab's compute core on synthetic stores.
+
+    python benchmarks/bench_core.py --sizes 100 1000 10000 100000
+    python benchmarks/bench_core.py --compare benchmarks/results/<previous>.json
+
+Results are written to ``benchmarks/results/`` as JSON so runs can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dcx_core import (  # noqa: E402
+    TEXT_COLUMNS, clean_token_column, term_frequencies, extract_image_links, network_slider_bounds,
+    cooccurrence_graph, reduce_network, network_metrics, network_layout, lda_inputs, train_lda, store_sentiment, column_tokens
+)
+from dcx_render import wordcloud_frequencies, wordcloud_png  # noqa: E402
+from dcx_synth import generate, StubClassifier  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+
+
+def _cooccurrence_layout(df_store):
+    token_lists = clean_token_column(df_store['Tokens'])
+    _, _, min_freq = network_slider_bounds(len(df_store))
+    G, word_freq = cooccurrence_graph(token_lists, min_freq)
+    G = reduce_network(G, word_freq)
+    if G.number_of_nodes():
+        network_layout(G)
+    return G.number_of_edges()
+
+
+def _network_metrics(df_store):
+    token_lists = clean_token_column(df_store['Tokens'])
+    G, _ = cooccurrence_graph(token_lists, network_slider_bounds(len(df_store))[2])
+    return len(network_metrics(G)[0]) if G.number_of_nodes() else 0
+
+
+def _lda(df_store):
+    dictionary, corpus = lda_inputs(df_store)
+    train_lda(corpus, dictionary)
+    return len(corpus)
+
+
+def _wordcloud(df_store, tier):
+    # Time to one rendered tier of the Content wordcloud, word weights included
+    frequencies = wordcloud_frequencies(' '.join(column_tokens(df_store, 'Content')))
+    return len(wordcloud_png(frequencies, tier)) if frequencies else 0
+
+
+def _sentiment(df_store, delay):
+    store_sentiment(df_store, StubClassifier(delay))
+    return len(df_store)
+
+
+STAGES = {
+    'clean_tokens': lambda df_store, args: len(clean_token_column(df_store['Tokens'])),
+    'term_frequencies': lambda df_store, args: sum(len(term_frequencies(df_store, c)) for c in TEXT_COLUMNS),
+    'cooccurrence_layout': lambda df_store, args: _cooccurrence_layout(df_store),
+    'network_metrics': lambda df_store, args: _network_metrics(df_store),
+    'lda': lambda df_store, args: _lda(df_store),
+    'wordcloud_preview': lambda df_store, args: _wordcloud(df_store, 'preview'),
+    'wordcloud_display': lambda df_store, args: _wordcloud(df_store, 'display'),
+    'wordcloud_full': lambda df_store, args: _wordcloud(df_store, 'full'),
+    'image_links': lambda df_store, args: len(extract_image_links(df_store)[0]),
+    'sentiment_stub': lambda df_store, args: _sentiment(df_store, args.stub_delay),
+}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = []
+    for size in args.sizes:
+        df_store = generate(n_stores=1, n_reviews=size, skew=args.skew, seed=size)
+        for stage in args.stages:
+            timings, items = [], None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                items = STAGES[stage](df_store, args)
+                timings.append(time.perf_counter() - start)
+            row = {'stage': stage, 'reviews': size, 'items': items,
+                   'median_s': statistics.median(timings), 'min_s': min(timings)}
+            results.append(row)
+            print(f"{stage:>20} {size:>8} reviews  median {row['median_s']:.4f}s  min {row['min_s']:.4f}s")
+    return results
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['stage'], r['reviews']): r for r in json.load(f)['results']}
+    print(f"\nvs {baseline_path}")
+    for row in results:
+        old = baseline.get((row['stage'], row['reviews']))
+        if old:
+            print(f"{row['stage']:>20} {row['reviews']:>8}  {old['median_s']:.4f}s -> {row['median_s']:.4f}s "
+                  f"({old['median_s'] / row['median_s']:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='reviews per store')
+    parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skew', type=float, default=1.1)
+    parser.add_argument('--stub-delay', type=float, default=0.0, help='seconds per text for the stub classifier')
+    parser.add_argument('--out', help='result file (default: benchmarks/results/bench-<timestamp>.json)')
+    parser.add_argument('--compare', help='previous result file to compare against')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    out = args.out or os.path.join(RESULTS_DIR, f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {'timestamp': time.time(), 'git': git_revision(), 'python': platform.python_version(),
+                     'machine': platform.machine(), 'cpus': os.cpu_count(), 'repeat': args.repeat},
+            'results': results,
+        }, f, indent=2)
+    print(f"\nsaved {out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Sentiment inference throughput: one process vs. an InferencePool of N workers.
+
+    python benchmarks/bench_inference.py --texts 20000 --workers 1 2 4 8 16
+    python benchmarks/bench_inference.py --stub --stub-delay 0.002 --workers 1 2 4
+
+Texts are synthetic review sentences. ``workers 1`` is the in-process
+baseline (``score_texts`` with the process-wide torch thread count); larger
+counts fork a pool that shares the already-loaded model.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def load_classifier(args):
+    if args.stub:
+        from dcx_synth import StubClassifier
+        return StubClassifier(delay=args.stub_delay)
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model="matthewburke/korean_sentiment")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--texts', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--shard-size', type=int, default=256)
+    parser.add_argument('--stub', action='store_true', help='use the deterministic stub classifier')
+    parser.add_argument('--stub-delay', type=float, default=0.001, help='stub seconds per text')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write results as JSON here')
+    args = parser.parse_args(argv)
+
+    from dcx_core import score_texts
+    from dcx_inference import InferencePool
+    from dcx_synth import generate
+
+    texts = generate(n_stores=50, n_reviews=args.texts, seed=args.seed)['review_sentences'].dropna().astype(str)
+    texts = texts.tolist()[:args.texts]
+    classifier = load_classifier(args)
+
+    # Fork every pool before the parent runs inference (see dcx_inference)
+    pools = {n: InferencePool(classifier, workers=n, threads_per_worker=args.threads_per_worker,
+                              batch_size=args.batch_size, shard_size=args.shard_size).start()
+             for n in args.workers if n > 1}
+    results = []
+    try:
+        for n in args.workers:
+            started = time.perf_counter()
+            if n > 1:
+                pools[n].score(texts)
+            else:
+                score_texts(texts, classifier, args.batch_size)
+            seconds = time.perf_counter() - started
+            results.append({'workers': n, 'texts': len(texts), 'seconds': seconds,
+                            'texts_per_second': len(texts) / seconds})
+    finally:
+        for pool in pools.values():
+            pool.close()
+
+    base = results[0]['texts_per_second']
+    print(f"{'workers':>8} {'texts':>7} {'seconds':>9} {'texts/s':>9} {'speedup':>8}")
+    for row in results:
+        row['speedup'] = row['texts_per_second'] / base
+        print(f"{row['workers']:>8} {row['texts']:>7} {row['seconds']:>9.2f} {row['texts_per_second']:>9.0f} "
+              f"{row['speedup']:>8.2f}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
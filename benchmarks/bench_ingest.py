@@ -0,0 +1,106 @@
+"""Peak-memory benchmark of dataset ingestion on a synthetic region CSV.
+
+    python benchmarks/bench_ingest.py --gb 2
+    python benchmarks/bench_ingest.py --csv big.csv --chunksize 20000 100000
+
+Each mode runs in a fresh subprocess and reports wall time and peak RSS:
+``single`` is the old one-pass ``pd.read_csv`` with inferred dtypes,
+``chunked`` the typed chunked in-memory load, ``spill`` the chunked load
+appending to a Parquet file.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _child(mode, csv_path, chunksize):
+    import pandas as pd
+    from dcx_core import DATASET_COLUMNS, KEYWORD_ENGLISH_MAP, read_dataset
+
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode == 'single':
+        df = pd.read_csv(csv_path, usecols=DATASET_COLUMNS).rename(columns=KEYWORD_ENGLISH_MAP)
+        rows, frame_mb = len(df), df.memory_usage(deep=True).sum() / 2**20
+    elif mode == 'chunked':
+        df = read_dataset(csv_path, chunksize=chunksize)
+        rows, frame_mb = len(df), df.memory_usage(deep=True).sum() / 2**20
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            spill = read_dataset(csv_path, chunksize=chunksize, spill_path=os.path.join(tmp, 'region.parquet'))
+            import pyarrow.parquet as pq
+            rows, frame_mb = pq.ParquetFile(spill).metadata.num_rows, None
+    print(json.dumps({'mode': mode, 'chunksize': chunksize, 'rows': rows, 'seconds': time.perf_counter() - start,
+                      'peak_rss_mb': _peak_rss_mb(), 'baseline_rss_mb': baseline, 'frame_mb': frame_mb}))
+
+
+def run_mode(mode, csv_path, chunksize):
+    out = subprocess.run([sys.executable, __file__, '--child', mode, '--csv', csv_path,
+                          '--chunksize', str(chunksize)], capture_output=True, text=True)
+    if out.returncode != 0:
+        return {'mode': mode, 'chunksize': chunksize, 'error': out.stderr.strip().splitlines()[-1:]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def make_csv(path, gb, seed):
+    from dcx_synth import generate_raw, write_csv
+
+    sample = generate_raw(n_stores=10, n_reviews=2_000, seed=seed)
+    bytes_per_row = len(sample.to_csv(index=False).encode('utf-8')) / len(sample)
+    rows = int(gb * 2**30 / bytes_per_row)
+    print(f"writing ~{gb} GB ({rows:,} rows) to {path}")
+    write_csv(path, rows, n_stores=2_000, seed=seed)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', help='existing region CSV (default: generate one)')
+    parser.add_argument('--gb', type=float, default=2.0, help='size of the generated CSV')
+    parser.add_argument('--modes', nargs='+', default=['single', 'chunked', 'spill'],
+                        choices=['single', 'chunked', 'spill'])
+    parser.add_argument('--chunksize', type=int, nargs='+', default=[50_000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write results as JSON here')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child, args.csv, args.chunksize[0])
+        return
+
+    csv_path = args.csv or make_csv(os.path.join(tempfile.gettempdir(), f'dcx_synthetic_{args.gb:g}gb.csv'),
+                                    args.gb, args.seed)
+    print(f"{os.path.getsize(csv_path) / 2**30:.2f} GB CSV")
+    results = []
+    for mode in args.modes:
+        for chunksize in (args.chunksize if mode != 'single' else [0]):
+            row = run_mode(mode, csv_path, chunksize)
+            results.append(row)
+            if 'error' in row:
+                print(f"{mode:>8} chunk {chunksize:>7}  failed: {row['error']}")
+            else:
+                frame = f"{row['frame_mb']:.0f} MB" if row['frame_mb'] is not None else 'on disk'
+                print(f"{mode:>8} chunk {chunksize:>7}  {row['seconds']:7.1f}s  peak RSS {row['peak_rss_mb']:8.0f} MB"
+                      f"  frame {frame}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
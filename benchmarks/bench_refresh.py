@@ -0,0 +1,85 @@
+"""Delta refresh vs. full reload of a region on synthetic data.
+
+    python benchmarks/bench_refresh.py --reviews 500000 --stores 250 1000 4000 --deltas 100 1000 10000
+
+For each store count a synthetic region of ``--reviews`` reviews is loaded
+as the app does (``Region`` plus its catalog, similar-stores index, search
+index and rollups). For each delta size a newer export (the current file
+plus new rows) is folded in with ``Region.refresh`` and compared with
+reloading that export from scratch. Reload time tracks the region; refresh
+time should track the delta, plus the per-store rebuilds (catalog ranking,
+similar-stores matrix), which grow with the store count at a fixed delta.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+REGION = 'Jeju Island'
+
+
+def build_all(region):
+    region.catalog, region.similar, region.search, region.rollups
+    return region
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=200_000)
+    parser.add_argument('--stores', type=int, nargs='+', default=[250, 1_000, 4_000])
+    parser.add_argument('--deltas', type=int, nargs='+', default=[100, 1_000, 10_000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write results as JSON here')
+    args = parser.parse_args(argv)
+
+    from dcx_core import DATASET_MAP, dataset_cache_path
+    from dcx_region import Region
+    from dcx_synth import generate_raw, write_csv
+
+    name = DATASET_MAP[REGION]
+    workdir = tempfile.mkdtemp(prefix="dcx_refresh_")
+    results = []
+    print(f"{'stores':>7} {'delta':>8} {'changed':>8} {'refresh':>9} {'reload':>9}")
+    try:
+        for n_stores in args.stores:
+            store_dir = os.path.join(workdir, f"s{n_stores}")
+            os.makedirs(store_dir)
+            os.chdir(store_dir)  # Region keeps its cache file, rollups and search index relative to the cwd
+            write_csv(dataset_cache_path(name), args.reviews, n_stores=n_stores, seed=args.seed)
+            region = build_all(Region(name))
+
+            for i, n in enumerate(args.deltas):
+                export = os.path.join(store_dir, 'export.csv')
+                shutil.copyfile(region.path, export)
+                delta = generate_raw(n_stores=min(n_stores, n), n_reviews=n, seed=args.seed + 1000 + i,
+                                     start='2025-01-01', end='2025-12-31')
+                delta.to_csv(export, mode='a', header=False, index=False)
+
+                started = time.perf_counter()
+                changed = region.refresh(export)
+                refresh = time.perf_counter() - started
+
+                started = time.perf_counter()
+                build_all(Region(name))
+                reload = time.perf_counter() - started
+
+                results.append({'stores': n_stores, 'delta': n, 'rows': len(region.df),
+                                'changed_stores': len(changed), 'refresh_seconds': refresh,
+                                'reload_seconds': reload})
+                print(f"{n_stores:>7} {n:>8} {len(changed):>8} {refresh:>8.2f}s {reload:>8.2f}s")
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""Concurrent-session load test of the Streamlit app on synthetic data.
+
+    python benchmarks/run_load_test.py --sessions 1 2 4 8 --reviews 200000
+    python benchmarks/run_load_test.py --sessions 4 --stub-delay 0.005 --sentiment-rate 1 --lda-rate 0.5
+
+Drives the real app script headless through ``streamlit.testing.v1.AppTest``,
+one instance per simulated user, all in this process so ``st.cache_*`` is
+shared as it is on a server. The region dataset is a synthetic CSV written
+where ``download_dataset`` looks for its cache file, the sentiment pipeline
+is swapped for ``dcx_synth.StubClassifier`` and translation for a no-op.
+
+Each session opens the app, picks the region and a store, confirms, then
+visits every tab: Photos & Reviews, Word Cloud, Treemap, Network Analysis
+(moving the frequency slider), Topic Modeling and Customer Satisfaction,
+running LDA / sentiment with the given probabilities. Switching tabs makes
+the app delete the session's widget state, which a browser re-sends but an
+``AppTest`` cannot, so every tab is opened by a fresh ``AppTest`` whose
+session already holds the confirmed region, store and tab. Sessions share
+one fallback runtime (see ``share_test_runtime``). Per concurrency
+level it reports latency percentiles per action, actions/s, sessions/min
+and peak RSS; the exit status is 1 if any step failed.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+APP = os.path.join(ROOT, "IBA-DCX_Analytics_2.0.py")
+ASSETS = ["DCX_Tool.png"]  # opened by the app relative to the cwd
+REGION = 'Jeju Island'
+
+
+class _IdentityTranslator:
+    class _Result:
+        def __init__(self, text):
+            self.text = text
+
+    def translate(self, text, dest=None):
+        return self._Result(text)
+
+
+def install_stand_ins(stub_delay):
+    """Swap the model and translation for local stand-ins (the app re-imports them on every run)."""
+    import transformers
+    from dcx_synth import StubClassifier
+
+    transformers.pipeline = lambda *args, **kwargs: StubClassifier(stub_delay)
+    try:
+        import googletrans
+        googletrans.Translator = _IdentityTranslator
+    except ImportError:
+        pass
+
+
+def share_test_runtime():
+    """Share the runtime and the compiled script between sessions, as a server does.
+
+    ``AppTest`` installs a mock ``Runtime`` for each script run and clears the
+    process-wide instance when the run ends, so with concurrent sessions one
+    session's teardown removes the runtime under another's running script
+    (``RuntimeError: Runtime hasn't been created!``, then a hung run). A
+    mock set up the same way stands in whenever the instance is cleared.
+
+    Each ``AppTest`` run also compiles the script into its own cache, and
+    concurrent compiles can fail on Python 3.11 ("AST constructor recursion
+    depth mismatch"), leaving the run with no output. One cache is shared.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    fallback = MagicMock(spec=Runtime)
+    fallback.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    fallback.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance or fallback)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    shared = ScriptCache()
+
+    def share_cache(self):
+        self._cache, self._lock = shared._cache, shared._lock
+    ScriptCache.__init__ = share_cache
+
+
+def prepare_workdir(workdir, n_reviews, n_stores, seed):
+    """Write the synthetic dataset and copy the app's assets into ``workdir``."""
+    from dcx_core import DATASET_MAP, dataset_cache_path
+    from dcx_synth import write_csv
+
+    for asset in ASSETS:
+        shutil.copyfile(os.path.join(ROOT, asset), os.path.join(workdir, asset))
+    path = os.path.join(workdir, dataset_cache_path(DATASET_MAP[REGION]))
+    if not os.path.exists(path):
+        print(f"writing {n_reviews:,} synthetic reviews over {n_stores} stores to {path}")
+        write_csv(path, n_reviews, n_stores=n_stores, seed=seed)
+    return path
+
+
+class _RssSampler(threading.Thread):
+    """Peak resident set size while running (Linux /proc; ru_maxrss elsewhere)."""
+
+    def __init__(self, interval=0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._done = threading.Event()
+
+    @staticmethod
+    def current_mb():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except OSError:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak_mb = max(self.peak_mb, self.current_mb())
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak_mb = max(self.peak_mb, self.current_mb())
+        return self.peak_mb
+
+
+def _by_label(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+class Session:
+    def __init__(self, session_id, args, record):
+        self.id = session_id
+        self.args = args
+        self.record = record
+        self.rng = random.Random(args.seed * 1000 + session_id)
+
+    def _step(self, action, fn):
+        started = time.perf_counter()
+        error = None
+        try:
+            at = fn()
+            if at is not None and len(at.exception):
+                error = at.exception[0].message
+        except Exception as e:  # a failed step is reported, the session moves on
+            error = repr(e)
+        self.record(action, time.perf_counter() - started, error)
+
+    def run(self):
+        try:
+            self._scenario()
+        except Exception as e:  # e.g. a widget the scenario needs never appeared
+            self.record("session_aborted", 0.0, repr(e))
+
+    def _app(self):
+        from streamlit.testing.v1 import AppTest
+
+        return AppTest.from_file(APP, default_timeout=self.args.timeout)
+
+    def _tab(self, tab, store):
+        """A fresh app session with ``store`` confirmed, opened on ``tab``."""
+        at = self._app()
+        state = {'location_locked': True, 'selected_location': REGION, 'selected_store': store,
+                 'current_tab': tab, 'feature': tab}
+        for key, value in state.items():  # AppTest's session_state has no update()
+            at.session_state[key] = value
+        self._step(f"tab:{tab}", at.run)
+        return at
+
+    def _scenario(self):
+        at = self._app()
+        self._step("open", at.run)
+        self._step("select_region", lambda: at.selectbox(key="loc").select(REGION).run())
+        stores = [s for s in at.selectbox(key="store").options if s]
+        # Selectbox options are rendered with their review counts; the value is the store name
+        store = self.rng.choice(stores[:self.args.top_stores]).rsplit(" (", 1)[0]
+        self._step("select_store", lambda: at.selectbox(key="store").select(store).run())
+        self._step("confirm", lambda: _by_label(at.sidebar.button, "✅ Region/Store has been selected").click().run())
+        if 'selected_store' not in at.session_state or at.session_state['selected_store'] != store:
+            raise LookupError(f"store {store!r} was not confirmed")
+
+        for tab in ["Photos & Reviews", "Word Cloud", "Treemap"]:
+            self._tab(tab, store)
+
+        at = self._tab("Network Analysis", store)
+
+        def move_slider():
+            slider = _by_label(at.slider, "Minimum word frequency")
+            return slider.set_value(self.rng.randint(int(slider.min), int(slider.max))).run()
+        self._step("network_slider", move_slider)
+
+        at = self._tab("Topic Modeling", store)
+        if self.rng.random() < self.args.lda_rate:
+            buttons = [b for b in at.button if b.label == "Execute Topic Modeling"]
+            if buttons:  # absent when the store's topics are already cached
+                self._step("run_lda", lambda: buttons[0].click().run())
+
+        at = self._tab("Customer Satisfaction Analysis", store)
+        if self.rng.random() < self.args.sentiment_rate:
+            buttons = [b for b in at.button if b.label == "🧠 Start Customer Satisfaction Analysis"]
+            if buttons:  # absent when the store's result is already cached
+                self._step("run_sentiment", lambda: buttons[0].click().run())
+
+
+def run_level(n_sessions, args):
+    samples = defaultdict(list)
+    errors = defaultdict(list)
+    lock = threading.Lock()
+
+    def record(action, seconds, error):
+        with lock:
+            samples[action].append(seconds)
+            if error:
+                errors[action].append(error)
+
+    sampler = _RssSampler()
+    sampler.start()
+    started = time.perf_counter()
+    def user(i):
+        # One simulated user runs its sessions back to back; users overlap
+        for j in range(args.iterations):
+            Session(i * args.iterations + j, args, record).run()
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(n_sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    peak = sampler.stop()
+
+    all_seconds = [s for values in samples.values() for s in values]
+    per_action = {action: _percentiles(values) for action, values in sorted(samples.items())}
+    return {
+        'sessions': n_sessions * args.iterations,
+        'wall_seconds': wall,
+        'actions': len(all_seconds),
+        'actions_per_second': len(all_seconds) / wall if wall else None,
+        'sessions_per_minute': n_sessions * args.iterations / wall * 60 if wall else None,
+        'latency': _percentiles(all_seconds),
+        'per_action': per_action,
+        'errors': {action: len(e) for action, e in errors.items()},
+        'first_errors': {action: e[0] for action, e in errors.items()},
+        'peak_rss_mb': peak,
+    }
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'n': len(values), 'p50': p50, 'p90': p90, 'p99': p99, 'max': max(values)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8], help='concurrency levels')
+    parser.add_argument('--iterations', type=int, default=1, help='sessions started per simulated user')
+    parser.add_argument('--reviews', type=int, default=100_000)
+    parser.add_argument('--stores', type=int, default=200)
+    parser.add_argument('--top-stores', type=int, default=20, help='sessions pick among the N biggest stores')
+    parser.add_argument('--stub-delay', type=float, default=0.002, help='stub classifier seconds per text')
+    parser.add_argument('--lda-rate', type=float, default=0.25, help='share of sessions that run LDA')
+    parser.add_argument('--sentiment-rate', type=float, default=0.5, help='share of sessions that run sentiment')
+    parser.add_argument('--clear-artifacts', action='store_true',
+                        help='empty the on-disk artifact cache before each level')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds one script run may take')
+    parser.add_argument('--workdir', help='where the synthetic dataset and caches live (default: temp dir)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write results as JSON here')
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="dcx_load_")
+    os.makedirs(workdir, exist_ok=True)
+    prepare_workdir(workdir, args.reviews, args.stores, args.seed)
+    os.chdir(workdir)  # the app keeps its dataset, rollups, indexes and artifacts relative to the cwd
+    install_stand_ins(args.stub_delay)
+    share_test_runtime()
+
+    results = []
+    print(f"{'sessions':>8} {'actions/s':>10} {'sess/min':>9} {'p50':>7} {'p90':>7} {'p99':>7} "
+          f"{'errors':>7} {'peak RSS':>9}")
+    for n in args.sessions:
+        if args.clear_artifacts:
+            shutil.rmtree(os.path.join(workdir, ".dcx_artifacts"), ignore_errors=True)
+        row = run_level(n, args)
+        results.append(row)
+        lat = row['latency']
+        print(f"{row['sessions']:>8} {row['actions_per_second']:>10.2f} {row['sessions_per_minute']:>9.1f} "
+              f"{lat.get('p50', 0):>6.2f}s {lat.get('p90', 0):>6.2f}s {lat.get('p99', 0):>6.2f}s "
+              f"{sum(row['errors'].values()):>7} {row['peak_rss_mb']:>7.0f}MB")
+        for action, stats in row['per_action'].items():
+            print(f"    {action:<36} n={stats['n']:<4} p50 {stats['p50']:6.2f}s  p90 {stats['p90']:6.2f}s  "
+                  f"p99 {stats['p99']:6.2f}s")
+        for action, error in row['first_errors'].items():
+            print(f"    ! {action}: {error}")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, default=float)
+    return 1 if any(row['errors'] for row in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Content-addressed on-disk cache for tab outputs (images, HTML, scores).
+
+An artifact's key hashes (dataset version, store, tab, parameters,
+``ARTIFACT_FORMAT``), where the app passes the store's content fingerprint as
+the version, so new reviews for a store, a different slider value or a code
+change simply miss instead of serving something stale. Entries are written
+atomically (temp file + ``os.replace``); reads refresh the file's mtime and
+the least recently used files are evicted once the directory grows past the
+size cap. The cache lives outside Streamlit's session state, so results
+survive tab switches, sessions and restarts.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+from dcx_metrics import REGISTRY, span
+
+# Version of what cached entries contain. Increment it in the same change
+# that alters a cached value for unchanged inputs (a different chart, layout,
+# score or topic model) or the pickled type of an entry, so old entries miss.
+# Changes that only affect speed, or that add a parameter to the key, keep it.
+ARTIFACT_FORMAT = 1
+ARTIFACT_DIR = os.environ.get("DCX_ARTIFACT_DIR", ".dcx_artifacts")
+MAX_BYTES = int(float(os.environ.get("DCX_ARTIFACT_MAX_MB", "2048")) * 2**20)
+EVICT_TO = 0.9  # fraction of the cap left after an eviction pass
+
+
+def file_digest(path, chunk_size=2**22):
+    """BLAKE2 hash object fed with a file's bytes; ``update`` it with bytes appended later."""
+    digest = hashlib.blake2b(digest_size=16)
+    with span("dataset_checksum") as s, open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+        s.items = f.tell()
+    return digest
+
+
+class ArtifactCache:
+    def __init__(self, root=ARTIFACT_DIR, max_bytes=MAX_BYTES, artifact_format=ARTIFACT_FORMAT):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.artifact_format = artifact_format
+        self._size = None  # bytes on disk, scanned lazily
+        self._lock = threading.Lock()
+
+    def key(self, dataset, store, tab, **params):
+        payload = json.dumps([self.artifact_format, dataset, store, tab, params], sort_keys=True,
+                             ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key, tab="artifact"):
+        """Cached value or ``None``; counts a request (and a miss) for ``tab``."""
+        REGISTRY.cache_request(f"artifact_{tab}")
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            REGISTRY.cache_miss(f"artifact_{tab}")
+            return None
+        try:
+            os.utime(path)  # mtime doubles as the LRU clock
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        written = os.path.getsize(tmp)
+        os.replace(tmp, path)
+        REGISTRY.inc("dcx_artifact_bytes_written_total", written)
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan()[1]
+            else:
+                self._size += written
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def get_or_compute(self, dataset, store, tab, compute, **params):
+        """The artifact for these inputs, computing and storing it on a miss."""
+        key = self.key(dataset, store, tab, **params)
+        value = self.get(key, tab)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def _scan(self):
+        entries, total = [], 0
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:  # evicted by another process meanwhile
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self):
+        with span("artifact_evict") as s:
+            entries, total = self._scan()
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._size = total
+            REGISTRY.inc("dcx_artifact_evictions_total", removed)
+            s.items = removed
@@ -0,0 +1,368 @@
+"""Batch report generator: analyze every store of a region without Streamlit.
+
+    python dcx_batch.py --region "Jeju Island" --out reports/jeju --workers 8
+    python dcx_batch.py --csv region.csv --out reports/test --stub-classifier --scaling 1 2 4 8
+    python dcx_batch.py --region "Jeju Island" --out reports/jeju --inference-workers 16
+
+Each store gets a directory with wordcloud/treemap/network PNGs, the pyLDAvis
+HTML and Parquet tables (word frequencies, network edges and metrics, LDA
+topics, sentiment). A store directory only appears once all of its artifacts are
+written, so rerunning the same command resumes an interrupted run.
+
+With ``--inference-workers`` the store workers skip sentiment; afterwards the
+texts of all unscored stores are scored together by one ``InferencePool`` that
+shares a single copy of the model, and their directories are updated in place.
+
+With ``--spill`` the region is written to a Parquet file in the output
+directory instead of being held in memory, and each store's rows are read
+back from it on their own, for regions larger than RAM.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")
+
+import pandas as pd  # noqa: E402
+
+from dcx_core import (  # noqa: E402
+    DATASET_MAP, TEXT_COLUMNS, download_dataset, read_dataset, read_spilled, clean_token_column, column_tokens,
+    term_frequencies, treemap_data, extract_image_links, network_slider_bounds, cooccurrence_graph,
+    network_layout, frequency_colors, reduce_network, network_metrics, NETWORK_TOP_K, BACKBONE_ALPHA, lda_inputs, train_lda, lda_topics, store_sentiment, sentiment_inputs,
+    summarize_sentiment, ScoringPlan
+)
+from dcx_render import wordcloud_frequencies, wordcloud_png, treemap_figure, network_figure, figure_png  # noqa: E402
+
+DONE_MARKER = "_done.json"
+SPILL_FILE = "_region.parquet"
+MIN_NETWORK_REVIEWS = 20
+MIN_TOPIC_REVIEWS = 50
+MIN_SENTIMENT_REVIEWS = 50
+
+# Per-worker state, set up by _init_worker
+_DF = None
+_SPILL = None
+_OPTIONS = None
+_CLASSIFIER = None
+
+
+def store_slug(store):
+    """Filesystem-safe, collision-free directory name for a store."""
+    digest = hashlib.sha1(store.encode("utf-8")).hexdigest()[:8]
+    return f"{re.sub(r'[^0-9A-Za-z가-힣._-]+', '_', store).strip('_')[:60]}-{digest}"
+
+
+def _init_worker(csv_path, options, spill_path=None):
+    global _DF, _OPTIONS, _SPILL
+    _SPILL = spill_path
+    if _DF is None and spill_path is None:
+        _DF = read_dataset(csv_path)
+    _OPTIONS = options
+
+
+def _store_frame(store):
+    """One store's rows, from the spilled region file when there is one."""
+    if _SPILL is not None:
+        return read_spilled(_SPILL, stores=[store])
+    return _DF[_DF['Name'] == store]
+
+
+def _load_classifier(options):
+    if options['stub_classifier']:
+        from dcx_synth import StubClassifier
+        return StubClassifier()
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model="matthewburke/korean_sentiment")
+
+
+def _classifier():
+    global _CLASSIFIER
+    if _CLASSIFIER is None:
+        _CLASSIFIER = _load_classifier(_OPTIONS)
+    return _CLASSIFIER
+
+
+def _write_png(path, fig):
+    with open(path, "wb") as f:
+        f.write(figure_png(fig))
+
+
+def analyze_store(store, out_dir):
+    """Write all artifacts of one store; returns its summary row."""
+    started = time.perf_counter()
+    df_store = _store_frame(store)
+    final_dir = os.path.join(out_dir, store_slug(store))
+    work_dir = final_dir + ".partial"
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+
+    # Word frequencies, treemaps and wordclouds
+    freq_rows = []
+    for column in TEXT_COLUMNS:
+        word_count = term_frequencies(df_store, column)
+        freq_rows.extend((column, word, count) for word, count in word_count.items())
+        if not word_count:
+            continue
+        sizes, labels = treemap_data(word_count)
+        _write_png(os.path.join(work_dir, f"treemap_{column}.png"), treemap_figure(sizes, labels))
+        frequencies = wordcloud_frequencies(' '.join(column_tokens(df_store, column))) if _OPTIONS['wordclouds'] else None
+        if frequencies:
+            with open(os.path.join(work_dir, f"wordcloud_{column}.png"), "wb") as f:
+                f.write(wordcloud_png(frequencies, 'full'))
+    freqs = pd.DataFrame(freq_rows, columns=['column', 'word', 'count'])
+    freqs.to_parquet(os.path.join(work_dir, "word_frequencies.parquet"), index=False)
+
+    summary = {
+        'store': store,
+        'dir': os.path.basename(final_dir),
+        'reviews': len(df_store),
+        'images': len(extract_image_links(df_store)[0]),
+        'top_words': ' '.join(w for w, _ in term_frequencies(df_store, 'Content').most_common(10)),
+    }
+
+    # Network
+    if len(df_store) >= MIN_NETWORK_REVIEWS:
+        token_lists = clean_token_column(df_store['Tokens'])
+        min_freq = _OPTIONS['min_freq'] or network_slider_bounds(len(df_store))[2]
+        G, word_freq = cooccurrence_graph(token_lists, min_freq)
+        edges = pd.DataFrame([(u, v, d['weight']) for u, v, d in G.edges(data=True)],
+                             columns=['source', 'target', 'weight'])
+        edges.to_parquet(os.path.join(work_dir, "network_edges.parquet"), index=False)
+        summary.update(network_nodes=G.number_of_nodes(), network_edges=G.number_of_edges())
+        if G.number_of_nodes():
+            metrics, info = network_metrics(G)
+            metrics.reset_index(names='word').to_parquet(os.path.join(work_dir, "network_metrics.parquet"), index=False)
+            summary.update(network_communities=int(metrics['community'].nunique()),
+                           network_betweenness=info['betweenness'])
+        # The edge table keeps the full graph; the picture only the reduced backbone
+        G = reduce_network(G, word_freq, _OPTIONS['top_k'], _OPTIONS['alpha'])
+        if G.number_of_nodes():
+            fig = network_figure(G, network_layout(G), frequency_colors(G, word_freq), f"{store} - Network Analysis")
+            _write_png(os.path.join(work_dir, "network.png"), fig)
+
+    # Topic modeling
+    if _OPTIONS['topics'] and len(df_store) >= MIN_TOPIC_REVIEWS:
+        dictionary, corpus = lda_inputs(df_store)
+        model = train_lda(corpus, dictionary, _OPTIONS['num_topics'])
+        lda_topics(model).to_parquet(os.path.join(work_dir, "lda_topics.parquet"), index=False)
+        if _OPTIONS['lda_html']:
+            import pyLDAvis
+            import pyLDAvis.gensim as gensimvis
+            pyLDAvis.save_html(gensimvis.prepare(model, corpus, dictionary), os.path.join(work_dir, "lda.html"))
+
+    # Sentiment (left to the shared inference pool when --inference-workers is set)
+    if _OPTIONS['sentiment'] and not _OPTIONS['inference_workers'] and len(df_store) >= MIN_SENTIMENT_REVIEWS:
+        _write_sentiment(work_dir, summary, store_sentiment(df_store, _classifier()))
+
+    summary['seconds'] = time.perf_counter() - started
+    _write_marker(work_dir, summary)
+    shutil.rmtree(final_dir, ignore_errors=True)
+    os.replace(work_dir, final_dir)
+    return summary
+
+
+def _write_sentiment(store_dir, summary, result):
+    rows = [('total', result['total'])] + list(result['keywords'].items())
+    pd.DataFrame(rows, columns=['aspect', 'score']).to_parquet(
+        os.path.join(store_dir, "sentiment.parquet"), index=False)
+    summary['sentiment_total'] = result['total']
+    summary.update({f"sentiment_{k}": v for k, v in result['keywords'].items()})
+
+
+def _write_marker(store_dir, summary):
+    tmp = os.path.join(store_dir, DONE_MARKER + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(store_dir, DONE_MARKER))
+
+
+def score_pending_sentiment(store_frame, out_dir, summaries, options, log=print):
+    """Score every finished store that still lacks sentiment with one shared inference pool.
+
+    ``store_frame`` returns the rows of one store.
+    """
+    from dcx_inference import InferencePool
+
+    pending = [s for s, summary in summaries.items()
+               if 'sentiment_total' not in summary and summary['reviews'] >= MIN_SENTIMENT_REVIEWS]
+    if not pending:
+        return 0
+    # One plan over all stores' inputs: small stores still fill the shards, and a text
+    # repeated within or across stores is scored once
+    plan = ScoringPlan({(store, column): series for store in pending
+                        for column, series in sentiment_inputs(store_frame(store)).items()})
+    log(f"scoring {len(plan)} distinct of {plan.total_texts} texts of {len(pending)} stores "
+        f"with {options['inference_workers']} inference workers")
+
+    started = time.perf_counter()
+    with InferencePool(_load_classifier(options), workers=options['inference_workers'],
+                       threads_per_worker=options['threads_per_worker']) as pool:
+        scores = plan.score(pool)
+    seconds = time.perf_counter() - started
+    log(f"  {len(plan) / seconds if seconds else 0:.0f} texts/s, {plan.calls_saved} classifier calls saved")
+
+    column_scores = {store: {} for store in pending}
+    for (store, column), series in scores.items():
+        column_scores[store][column] = series
+    for store in pending:
+        summary = summaries[store]
+        store_dir = os.path.join(out_dir, summary['dir'])
+        _write_sentiment(store_dir, summary, summarize_sentiment(column_scores[store]))
+        _write_marker(store_dir, summary)
+    return len(pending)
+
+
+def completed_stores(out_dir):
+    done = {}
+    if not os.path.isdir(out_dir):
+        return done
+    for entry in os.listdir(out_dir):
+        marker = os.path.join(out_dir, entry, DONE_MARKER)
+        if os.path.exists(marker):
+            with open(marker, encoding="utf-8") as f:
+                summary = json.load(f)
+            done[summary['store']] = summary
+    return done
+
+
+def run_region(csv_path, out_dir, workers, options, stores=None, resume=True, log=print):
+    """Analyze all (remaining) stores; returns (summaries, failures, seconds)."""
+    global _DF, _SPILL
+    os.makedirs(out_dir, exist_ok=True)
+    if options['spill']:
+        df, spill = None, read_dataset(csv_path, spill_path=os.path.join(out_dir, SPILL_FILE))
+        counts = read_spilled(spill, columns=['Name'])['Name'].value_counts()
+    else:
+        df, spill = read_dataset(csv_path), None
+        counts = df['Name'].value_counts()
+    counts = counts[counts >= options['min_reviews']]
+    wanted = [s for s in counts.index if stores is None or s in stores]
+
+    summaries = completed_stores(out_dir) if resume else {}
+    todo = [s for s in wanted if s not in summaries]
+    log(f"{len(wanted)} stores, {len(wanted) - len(todo)} already done, {len(todo)} to analyze with {workers} workers")
+
+    # Forked workers inherit the frame instead of re-reading the CSV
+    _DF, _SPILL = df, spill
+    failures = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(csv_path, options, spill)) as pool:
+        futures = {pool.submit(analyze_store, store, out_dir): store for store in todo}
+        for n, future in enumerate(as_completed(futures), 1):
+            store = futures[future]
+            try:
+                summaries[store] = future.result()
+            except Exception as e:  # keep going; the store is retried on the next run
+                failures[store] = repr(e)
+                log(f"  ! {store}: {e!r}")
+            if n % 10 == 0 or n == len(todo):
+                elapsed = time.perf_counter() - started
+                log(f"  {n}/{len(todo)} stores, {n / elapsed * 60:.1f} stores/min")
+    if options['sentiment'] and options['inference_workers']:
+        score_pending_sentiment(_store_frame, out_dir, {s: summaries[s] for s in wanted if s in summaries},
+                                options, log)
+    seconds = time.perf_counter() - started
+    if spill is not None:
+        os.remove(spill)
+
+    summary = pd.DataFrame([summaries[s] for s in wanted if s in summaries])
+    summary.to_parquet(os.path.join(out_dir, "region_summary.parquet"), index=False)
+    summary.to_csv(os.path.join(out_dir, "region_summary.csv"), index=False)
+    with open(os.path.join(out_dir, "run.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            'csv': csv_path, 'workers': workers, 'analyzed': len(todo) - len(failures),
+            'failed': failures, 'seconds': seconds,
+            'stores_per_minute': (len(todo) - len(failures)) / seconds * 60 if seconds and todo else None,
+        }, f, ensure_ascii=False, indent=2)
+    return summaries, failures, seconds
+
+
+def run_scaling(csv_path, out_dir, worker_counts, options, stores=None):
+    """Rerun the whole region from scratch for each worker count and report throughput."""
+    rows = []
+    for workers in worker_counts:
+        scratch = os.path.join(out_dir, "_scaling", f"w{workers}")
+        shutil.rmtree(scratch, ignore_errors=True)
+        summaries, failures, seconds = run_region(csv_path, scratch, workers, options, stores, resume=False,
+                                                  log=lambda *a: None)
+        analyzed = len(summaries)
+        rows.append({'workers': workers, 'stores': analyzed, 'seconds': seconds,
+                     'stores_per_minute': analyzed / seconds * 60})
+    base = rows[0]['stores_per_minute'] / rows[0]['workers']
+    print(f"{'workers':>8} {'stores':>7} {'seconds':>9} {'stores/min':>11} {'speedup':>8} {'efficiency':>10}")
+    for row in rows:
+        speedup = row['stores_per_minute'] / base
+        row.update(speedup=speedup, efficiency=speedup / row['workers'])
+        print(f"{row['workers']:>8} {row['stores']:>7} {row['seconds']:>9.1f} {row['stores_per_minute']:>11.1f} "
+              f"{speedup:>8.2f} {row['efficiency']:>10.0%}")
+    pd.DataFrame(rows).to_csv(os.path.join(out_dir, "_scaling", "scaling.csv"), index=False)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze every store of a region in parallel.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--region', choices=list(DATASET_MAP), help='region to download and analyze')
+    source.add_argument('--csv', help='local region CSV (same layout as the downloaded datasets)')
+    parser.add_argument('--out', required=True, help='output directory')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--stores', nargs='+', help='only these stores')
+    parser.add_argument('--min-reviews', type=int, default=1, help='skip stores with fewer reviews')
+    parser.add_argument('--min-freq', type=int, help='network minimum word frequency (default: slider default)')
+    parser.add_argument('--top-k', type=int, default=NETWORK_TOP_K, help='network picture: keep the top-K words')
+    parser.add_argument('--alpha', type=float, default=BACKBONE_ALPHA,
+                        help='network picture: disparity backbone significance (1 keeps all links)')
+    parser.add_argument('--num-topics', type=int, default=10)
+    parser.add_argument('--no-wordclouds', action='store_true')
+    parser.add_argument('--no-topics', action='store_true')
+    parser.add_argument('--no-lda-html', action='store_true')
+    parser.add_argument('--no-sentiment', action='store_true')
+    parser.add_argument('--stub-classifier', action='store_true', help='use the deterministic stub classifier')
+    parser.add_argument('--inference-workers', type=int, default=0, metavar='N',
+                        help='score sentiment after the store pass with N processes sharing one model')
+    parser.add_argument('--threads-per-worker', type=int, default=1, help='torch threads per inference worker')
+    parser.add_argument('--spill', action='store_true',
+                        help='keep the region in a Parquet file and read it store by store (bounded memory)')
+    parser.add_argument('--restart', action='store_true', help='ignore completed stores and start over')
+    parser.add_argument('--scaling', type=int, nargs='+', metavar='N',
+                        help='measure stores/min for each worker count instead of a normal run')
+    args = parser.parse_args(argv)
+
+    csv_path = args.csv or download_dataset(DATASET_MAP[args.region])
+    options = {
+        'min_reviews': args.min_reviews,
+        'min_freq': args.min_freq,
+        'top_k': args.top_k,
+        'alpha': args.alpha,
+        'num_topics': args.num_topics,
+        'wordclouds': not args.no_wordclouds,
+        'topics': not args.no_topics,
+        'lda_html': not args.no_lda_html,
+        'sentiment': not args.no_sentiment,
+        'stub_classifier': args.stub_classifier,
+        'inference_workers': args.inference_workers,
+        'threads_per_worker': args.threads_per_worker,
+        'spill': args.spill,
+    }
+    stores = set(args.stores) if args.stores else None
+
+    if args.scaling:
+        run_scaling(csv_path, args.out, args.scaling, options, stores)
+        return 0
+
+    summaries, failures, seconds = run_region(csv_path, args.out, args.workers, options, stores,
+                                              resume=not args.restart)
+    print(f"done: {len(summaries)} stores in {args.out}, {len(failures)} failed, {seconds:.1f}s")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Store catalog with prefix and fuzzy (jamo n-gram) search for the sidebar.
+
+Built once per dataset and extended copy-on-write with each refresh delta.
+Names are matched on a jamo-decomposed key so a half-typed syllable ("맛ㅈ")
+still prefix-matches "맛집", and on jamo bigrams for typo-tolerant fuzzy
+matches.
+"""
+import copy
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from dcx_core import IMAGE_PATTERN
+from dcx_metrics import span
+
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+INITIALS = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+MEDIALS = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+FINALS = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+          'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+MAX_PREFIX = 8  # jamo; longer queries are narrowed from the 8-jamo bucket
+
+
+def jamo_key(text):
+    """Lower-cased text with Hangul syllables decomposed into compatibility jamo and spaces removed."""
+    out = []
+    for ch in str(text).lower():
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            idx = code - HANGUL_BASE
+            out.append(INITIALS[idx // 588])
+            out.append(MEDIALS[(idx % 588) // 28])
+            out.append(FINALS[idx % 28])
+        elif not ch.isspace():
+            out.append(ch)
+    return ''.join(out)
+
+
+def _store_stats(df):
+    """Reviews and image links per store."""
+    if 'Image_Count' in df:
+        image_counts = df['Image_Count']
+    else:
+        image_counts = df['Image_Links'].map(lambda v: len(IMAGE_PATTERN.findall(v)) if isinstance(v, str) else 0)
+    return pd.DataFrame({'reviews': 1, 'images': image_counts}).groupby(df['Name'].astype(str)).sum()
+
+
+def _bigrams(key):
+    return {key[i:i + 2] for i in range(len(key) - 1)} if len(key) > 1 else {key}
+
+
+def _postings(names, keys, first_id):
+    """Prefix and bigram postings ({key: [store id]}) of stores numbered from ``first_id``."""
+    prefixes = defaultdict(list)
+    grams = defaultdict(list)
+    for store_id, (name, key) in enumerate(zip(names, keys), first_id):
+        starts = {key} | {jamo_key(word) for word in str(name).split()}
+        seen = set()
+        for word_key in starts:
+            for n in range(1, min(MAX_PREFIX, len(word_key)) + 1):
+                p = word_key[:n]
+                if p not in seen:
+                    seen.add(p)
+                    prefixes[p].append(store_id)
+        for g in _bigrams(key):
+            grams[g].append(store_id)
+    return prefixes, grams
+
+
+class StoreCatalog:
+    def __init__(self, names, reviews, images):
+        # Store ids follow insertion order, so extending never renumbers; _rank orders them by review count
+        self.names = list(names)
+        self.reviews = np.asarray(reviews, dtype=np.int64)
+        self.images = np.asarray(images, dtype=np.int64)
+        self.keys = [jamo_key(n) for n in self.names]
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+        prefixes, grams = _postings(self.names, self.keys, 0)
+        self._prefixes = {p: np.array(ids, dtype=np.int32) for p, ids in prefixes.items()}
+        self._grams = {g: np.array(ids, dtype=np.int32) for g, ids in grams.items()}
+        self._gram_counts = np.array([len(_bigrams(k)) for k in self.keys], dtype=np.int32)
+        self._rank_stores()
+
+    def _rank_stores(self):
+        # Most reviews first, ties by name
+        self._order = np.lexsort((np.array(self.names, dtype=str), -self.reviews))
+        self._rank = np.empty(len(self.names), dtype=np.int64)
+        self._rank[self._order] = np.arange(len(self.names))
+
+    @classmethod
+    def build(cls, df):
+        with span("build_store_catalog") as s:
+            stats = _store_stats(df)
+            catalog = cls(stats.index, stats['reviews'], stats['images'])
+            s.items = len(catalog)
+        return catalog
+
+    def extend(self, delta):
+        """Catalog with ``delta``'s reviews added, copy-on-write.
+
+        Only the new rows are counted and only new stores are indexed; the
+        postings of existing stores are shared with this catalog, which stays
+        valid for searches already running on it. The per-store lists and
+        counts are copied and every store is re-ranked, which is O(stores)
+        but vectorized and independent of the number of reviews.
+        """
+        with span("extend_store_catalog") as s:
+            stats = _store_stats(delta)
+            new = [name for name in stats.index if name not in self._positions]
+            new_keys = [jamo_key(n) for n in new]
+            catalog = copy.copy(self)
+            catalog.names = self.names + new
+            catalog.keys = self.keys + new_keys
+            catalog._positions = {**self._positions, **{name: len(self.names) + i for i, name in enumerate(new)}}
+            ids = np.array([catalog._positions[name] for name in stats.index], dtype=np.int64)
+            catalog.reviews = np.concatenate([self.reviews, np.zeros(len(new), dtype=np.int64)])
+            catalog.images = np.concatenate([self.images, np.zeros(len(new), dtype=np.int64)])
+            catalog.reviews[ids] += stats['reviews'].to_numpy(dtype=np.int64)
+            catalog.images[ids] += stats['images'].to_numpy(dtype=np.int64)
+
+            prefixes, grams = _postings(new, new_keys, len(self.names))
+            catalog._prefixes = _merge_postings(self._prefixes, prefixes)
+            catalog._grams = _merge_postings(self._grams, grams)
+            catalog._gram_counts = np.concatenate([
+                self._gram_counts, np.array([len(_bigrams(k)) for k in new_keys], dtype=np.int32)])
+            catalog._rank_stores()
+            s.items = len(delta)
+        return catalog
+
+    def __len__(self):
+        return len(self.names)
+
+    def info(self, name):
+        i = self._positions.get(name)
+        return None if i is None else {'name': name, 'reviews': int(self.reviews[i]), 'images': int(self.images[i])}
+
+    def search(self, query, limit=20):
+        """Store names matching ``query``: prefix matches first, then fuzzy matches, by review count."""
+        key = jamo_key(query)
+        if not key:
+            return [self.names[i] for i in self._order[:limit]]
+
+        ids = self._prefixes.get(key[:MAX_PREFIX], np.empty(0, dtype=np.int32))
+        if len(key) > MAX_PREFIX:
+            ids = np.array([i for i in ids if key in self.keys[i]], dtype=np.int32)
+        hits = ids[np.argsort(self._rank[ids], kind='stable')][:limit].tolist()
+
+        if len(hits) < limit:
+            seen = set(hits)
+            hits.extend(i for i in self._fuzzy(key, limit) if i not in seen)
+        return [self.names[i] for i in hits[:limit]]
+
+    def _fuzzy(self, key, limit, min_similarity=0.3):
+        query_grams = _bigrams(key)
+        postings = [self._grams[g] for g in query_grams if g in self._grams]
+        if not postings:
+            return []
+        overlap = np.bincount(np.concatenate(postings), minlength=len(self.names))
+        candidates = np.flatnonzero(overlap)
+        jaccard = overlap[candidates] / (len(query_grams) + self._gram_counts[candidates] - overlap[candidates])
+        keep = jaccard >= min_similarity
+        candidates, jaccard = candidates[keep], jaccard[keep]
+        order = np.lexsort((self._rank[candidates], -jaccard))[:limit]
+        return candidates[order].tolist()
+
+
+def _merge_postings(postings, added):
+    """``postings`` with the store ids of ``added`` appended; untouched arrays are shared."""
+    merged = dict(postings)
+    for key, ids in added.items():
+        ids = np.array(ids, dtype=np.int32)
+        merged[key] = np.concatenate([postings[key], ids]) if key in postings else ids
+    return merged
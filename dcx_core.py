@@ -0,0 +1,904 @@
+"""Headless compute core for the DCX tool.
+
+Everything here runs without Streamlit so the app, the batch CLI and the
+benchmarks share one implementation of each tab's analysis.
+"""
+import heapq
+import itertools
+import os
+import re
+import time
+from collections import Counter, defaultdict
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from dcx_metrics import REGISTRY, span
+
+###############################################
+# Dataset
+
+KEYWORD_COLUMNS_KO = ['맛', '서비스', '가격', '위치', '분위기', '위생']
+KEYWORD_COLUMNS_EN = ['Taste', 'Service', 'Price', 'Location', 'Atmosphere', 'Hygiene']
+KEYWORD_ENGLISH_MAP = dict(zip(KEYWORD_COLUMNS_KO, KEYWORD_COLUMNS_EN))
+DATASET_COLUMNS = ['Name', 'Content', 'Tokens', 'Image_Links'] + KEYWORD_COLUMNS_KO + ['review_sentences', 'Date']
+TEXT_COLUMNS = ['Content'] + KEYWORD_COLUMNS_EN
+
+DATASET_MAP = {
+    'Pusan National University': 'IBA-DCX_Analytics_2.0_PNU.csv',
+    'Kyung Hee University': 'IBA-DCX_Analytics_2.0_KHU.csv',
+    'Jeju Island': 'IBA-DCX_Analytics_2.0_Jeju.csv'
+}
+DATASET_FILE_IDS = {
+    'IBA-DCX_Analytics_2.0_PNU.csv': '1jfMMwnXi5zUOGE6F34B-KjQvfH5jjKmu',
+    'IBA-DCX_Analytics_2.0_KHU.csv': '1pqbNRLg8SdsmnZgi9JnqkxjDp7VUPlb4',
+    'IBA-DCX_Analytics_2.0_Jeju.csv': '1OeB_VE4bWYCLFAI85ozT7DwiL8V1W7yR'
+}
+
+
+def dataset_cache_path(dataset_name):
+    return f".cache_{dataset_name}"
+
+
+def download_dataset(dataset_name, fresh=False):
+    """Fetch the region CSV into the local cache file (once) and return its path.
+
+    With ``fresh`` the current export is always downloaded, next to the cache
+    file, for ``Region.refresh`` to take the new rows from.
+    """
+    output = dataset_cache_path(dataset_name) + ('.new' if fresh else '')
+    if fresh or not os.path.exists(output):
+        import gdown
+        file_id = DATASET_FILE_IDS.get(dataset_name)
+        with span("download_dataset", dataset=dataset_name):
+            gdown.download(f'https://drive.google.com/uc?id={file_id}', output, quiet=True)
+    return output
+
+
+# Explicit dtypes keep pandas from materializing every column as Python objects
+DATASET_DTYPES = {
+    'Name': 'string[pyarrow]',
+    'Content': 'string[pyarrow]',
+    'Tokens': 'string[pyarrow]',
+    'Image_Links': 'string[pyarrow]',
+    'review_sentences': 'string[pyarrow]',
+    **{col: 'string[pyarrow]' for col in KEYWORD_COLUMNS_KO},
+}
+CHUNK_SIZE = 50_000
+
+
+def normalize_chunk(chunk):
+    """Rename keyword columns, clean ``Tokens`` once and keep only the image links themselves."""
+    chunk = chunk.rename(columns=KEYWORD_ENGLISH_MAP)
+    chunk['Tokens'] = chunk['Tokens'].fillna('').map(lambda t: ' '.join(clean_tokens(t))).astype('string[pyarrow]')
+    links = chunk['Image_Links'].map(lambda v: IMAGE_PATTERN.findall(v) if isinstance(v, str) else [])
+    chunk['Image_Links'] = links.map(lambda ls: ' '.join(ls) if ls else None).astype('string[pyarrow]')
+    chunk['Image_Count'] = links.map(len).astype('int16')
+    chunk['Date'] = pd.to_datetime(chunk['Date'], errors='coerce')
+    return chunk
+
+
+def iter_dataset_chunks(path, chunksize=CHUNK_SIZE):
+    """Normalized, typed chunks of a region CSV."""
+    reader = pd.read_csv(path, usecols=DATASET_COLUMNS, dtype=DATASET_DTYPES, chunksize=chunksize)
+    for chunk in reader:
+        yield normalize_chunk(chunk)
+
+
+def _code_dtype(n_categories):
+    # The smallest code type pandas uses for this many categories, so codes are never recast
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class AppendableFrame:
+    """Dataset rows that grow by appending, at the cost of the appended rows only.
+
+    Text columns are Arrow-backed, so appending adds the new rows' Arrow
+    chunks without copying anything. Fixed-width columns (dates, counts and
+    the ``Name`` category codes) live in numpy buffers with spare capacity
+    that double when full. ``frame`` wraps the filled part of the buffers
+    without copying; a frame handed out earlier never sees later appends.
+    """
+
+    def __init__(self, df=None):
+        self._frame = None
+        self._n = 0
+        self._columns = []
+        self._buffers = {}     # column -> numpy buffer, first ``_n`` rows filled
+        self._chunks = {}      # text column -> pyarrow chunks
+        self._arrays = {}      # text column -> (pandas array type, arrow type)
+        self._categories = {}  # categorical column -> (categories in code order, their dtype)
+        self._codes = {}       # categorical column -> {category: code}
+        if df is not None:
+            self.append(df)
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def frame(self):
+        """The rows appended so far as a DataFrame (built once per append, on first use)."""
+        if self._frame is None:
+            self._frame = self._wrap()
+        return self._frame
+
+    def _setup(self, df):
+        self._columns = list(df.columns)
+        for col in self._columns:
+            dtype = df[col].dtype
+            if col == 'Name' or isinstance(dtype, pd.CategoricalDtype):
+                values_dtype = dtype.categories.dtype if isinstance(dtype, pd.CategoricalDtype) else dtype
+                self._categories[col], self._codes[col] = ([], values_dtype), {}
+                self._buffers[col] = np.empty(0, dtype=_code_dtype(0))
+            elif isinstance(dtype, pd.StringDtype) and dtype.storage.startswith('pyarrow'):
+                self._chunks[col] = []
+                self._arrays[col] = (type(df[col].array), df[col].array.__arrow_array__().type)
+            else:
+                self._buffers[col] = np.empty(0, dtype=dtype)
+
+    def _reserve(self, rows):
+        for col, buffer in self._buffers.items():
+            dtype = _code_dtype(len(self._codes[col])) if col in self._codes else buffer.dtype
+            if len(buffer) < rows or dtype != buffer.dtype:
+                grown = np.empty(max(rows, 2 * len(buffer), 1024), dtype=dtype)
+                grown[:self._n] = buffer[:self._n]
+                self._buffers[col] = grown
+
+    def _encode(self, col, values):
+        codes, uniques = pd.factorize(values)
+        lookup = self._codes[col]
+        for name in uniques:
+            if name not in lookup:
+                lookup[name] = len(lookup)
+                self._categories[col][0].append(name)
+        # Code -1 (a missing name) maps to the trailing -1
+        return np.array([lookup[name] for name in uniques] + [-1], dtype=np.int64)[codes]
+
+    def append(self, df):
+        """Append ``df`` (same columns as the first frame appended)."""
+        if not self._columns:
+            self._setup(df)
+        n, k = self._n, len(df)
+        codes = {col: self._encode(col, df[col]) for col in self._codes}
+        self._reserve(n + k)
+        for col in self._columns:
+            if col in self._codes:
+                self._buffers[col][n:n + k] = codes[col]
+            elif col in self._chunks:
+                arrow_type = self._arrays[col][1]
+                self._chunks[col].extend(chunk if chunk.type == arrow_type else chunk.cast(arrow_type)
+                                         for chunk in df[col].array.__arrow_array__().chunks)
+            else:
+                self._buffers[col][n:n + k] = df[col].to_numpy(dtype=self._buffers[col].dtype)
+        self._n = n + k
+        self._frame = None
+
+    def _wrap(self):
+        import pyarrow as pa
+
+        data = {}
+        for col in self._columns:
+            if col in self._codes:
+                categories, dtype = self._categories[col]
+                data[col] = pd.Categorical.from_codes(self._buffers[col][:self._n],
+                                                      categories=pd.Index(categories, dtype=dtype), validate=False)
+            elif col in self._chunks:
+                array_type, arrow_type = self._arrays[col]
+                data[col] = array_type(pa.chunked_array(self._chunks[col], type=arrow_type))
+            else:
+                data[col] = self._buffers[col][:self._n]
+        return pd.DataFrame(data, columns=self._columns, copy=False)
+
+
+def load_frame(path, chunksize=CHUNK_SIZE):
+    """A region CSV as an ``AppendableFrame``, read chunk by chunk."""
+    with span("load_dataset") as s:
+        frame = AppendableFrame()
+        for chunk in iter_dataset_chunks(path, chunksize):
+            frame.append(chunk)
+        if not len(frame):  # header-only file
+            frame = AppendableFrame(normalize_chunk(pd.read_csv(path, usecols=DATASET_COLUMNS,
+                                                                dtype=DATASET_DTYPES)))
+        s.items = len(frame)
+    return frame
+
+
+def read_dataset(path, chunksize=CHUNK_SIZE, spill_path=None):
+    """Load a region CSV chunk by chunk.
+
+    Without ``spill_path`` each chunk is appended to an ``AppendableFrame``,
+    whose text columns keep the chunks' Arrow buffers instead of copying them,
+    so peak memory is the final frame plus one chunk. With ``spill_path`` each
+    chunk is appended to a Parquet file instead and the path is returned,
+    keeping peak memory bounded by the chunk size for regions larger than RAM
+    (``dcx_batch --spill``).
+    """
+    if spill_path is not None:
+        with span("load_dataset") as s:
+            s.items = _spill_chunks(iter_dataset_chunks(path, chunksize), spill_path)
+        return spill_path
+    return load_frame(path, chunksize).frame
+
+
+def read_delta(path, skip_rows=0, since=None, chunksize=CHUNK_SIZE):
+    """Raw rows of a region CSV past its first ``skip_rows`` rows and, with ``since``, dated on or after it.
+
+    Rows come back untyped (every column as text, in file order) so they can
+    be appended to the local cache file verbatim; ``normalize_delta`` turns
+    them into dataset rows. Skipped rows are split into lines but not parsed.
+    Rows dated exactly ``since`` may already be loaded; the caller drops
+    those (see ``row_hashes``).
+    """
+    skip = (lambda i: 0 < i <= skip_rows) if skip_rows else None
+    parts = []
+    with span("read_delta") as s:
+        for chunk in pd.read_csv(path, dtype=str, skiprows=skip, chunksize=chunksize):
+            if since is not None:
+                chunk = chunk[pd.to_datetime(chunk['Date'], errors='coerce') >= since]
+            if len(chunk):
+                parts.append(chunk)
+        raw = pd.concat(parts, ignore_index=True) if parts else pd.read_csv(path, dtype=str, nrows=0)
+        s.items = len(raw)
+    return raw
+
+
+def normalize_delta(raw):
+    """Dataset rows (as ``read_dataset`` returns them) of raw ``read_delta`` rows."""
+    return normalize_chunk(raw[DATASET_COLUMNS].astype(DATASET_DTYPES))
+
+
+FINGERPRINT_COLUMNS = ['Content', 'Tokens', 'Date', 'Image_Links', 'review_sentences'] + KEYWORD_COLUMNS_EN
+FINGERPRINT_MASK = 2**64 - 1
+
+
+def row_hashes(df, columns=FINGERPRINT_COLUMNS):
+    """uint64 hash of each row's ``columns``, the same whichever frame the row is in.
+
+    Dates are hashed as int64 nanoseconds: their text form depends on the
+    other dates of the frame (midnight-only columns drop the time).
+    """
+    columns = [c for c in columns if c in df]
+    values = df[columns].astype({c: str for c in columns if c != 'Date'})
+    if 'Date' in values:
+        values['Date'] = df['Date'].to_numpy(dtype='datetime64[ns]').view('i8')
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def store_fingerprints(df, columns=FINGERPRINT_COLUMNS):
+    """Content hash per store; changes whenever any of the store's reviews change.
+
+    A store's hash is the sum (mod 2**64) of its rows' hashes, so after rows
+    are appended it is the old hash plus the hash of the new rows alone (see
+    ``add_fingerprints``).
+    """
+    return pd.Series(row_hashes(df, columns)).groupby(df['Name'].astype(str).values).sum()
+
+
+def add_fingerprints(fingerprints, delta):
+    """``{store: hash}`` after appending rows whose ``store_fingerprints`` are ``delta``."""
+    out = dict(fingerprints)
+    for store, fp in delta.items():
+        out[store] = (int(out.get(store, 0)) + int(fp)) & FINGERPRINT_MASK
+    return out
+
+
+def _spill_chunks(chunks, spill_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, rows = None, 0
+    tmp = f"{spill_path}.{os.getpid()}.tmp"
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(tmp, spill_path)
+    return rows
+
+
+def read_spilled(spill_path, stores=None, columns=None):
+    """Read (a subset of stores from) a spilled dataset, with the dtypes ``read_dataset`` gives."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    filters = [('Name', 'in', list(stores))] if stores is not None else None
+    table = pq.read_table(spill_path, columns=columns, filters=filters)
+    # pandas would restore text columns as Python-object strings
+    arrow_strings = {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}
+    df = table.to_pandas(types_mapper=arrow_strings.get)
+    if 'Name' in df:
+        df['Name'] = df['Name'].astype('category')
+    return df
+
+
+###############################################
+# Tokens
+
+# Stopwords definition (unchanged)
+stopwords = {
+    # Particles / Pronouns / Demonstratives
+    '이', '그', '저', '것', '거', '곳', '수', '좀', '처럼', '까지', '에도', '에도요', '이나', '라도',
+
+    # Conjunctions / Connectors
+    '그리고', '그래서', '그러나', '하지만', '또한', '즉', '결국', '때문에', '그래도',
+
+    # Predicates / Endings / Auxiliary verbs
+    '합니다', '해요', '했어요', '하네요', '하시네요', '하시던데요', '같아요', '있어요', '없어요',
+    '되네요', '되었어요', '보여요', '느껴져요', '하겠습니다', '되겠습니다', '있습니다', '없습니다',
+    '합니다', '이에요', '이라', '해서',
+
+    # Interjections / Review-specific expressions
+    'ㅎㅎ', 'ㅋㅋ', 'ㅠㅠ', '^^', '^^;;', '~', '~~', '!!!', '??', '!?', '?!', '...', '!!', '~!!', '~^^!!',
+
+    # Emphasis expressions
+    '아주', '정말', '진짜', '엄청', '매우', '완전', '너무', '굉장히', '많이', '많아요', '적당히', '넘',
+
+    # Others
+    '정도', '느낌', '같은', '니당', '네요', '있네요', '이네요', '이라서',
+    '해서요', '보니까', '봤어요', '먹었어요', '마셨어요', '갔어요', '봤습니다', '하는', '하게', '드네', '또시',
+    '이랑', '하고', '해도', '해도요', '때문에요', '이나요', '정도에요'
+}
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def clean_tokens(text):
+    text = _PUNCT_RE.sub("", text)  # Remove commas, periods, etc.
+    return text.split()
+
+
+def clean_token_column(tokens):
+    """Map a raw ``Tokens`` series to lists of cleaned tokens."""
+    with span("clean_tokens") as s:
+        cleaned = tokens.fillna('').map(str).map(clean_tokens)
+        s.items = len(cleaned)
+    return cleaned
+
+
+def column_tokens(df_store, column):
+    """Whitespace tokens of a text column with stopwords removed."""
+    text = ' '.join(df_store[column].dropna().map(str))
+    return [t for t in text.split() if t not in stopwords]
+
+
+def term_frequencies(df_store, column):
+    with span("term_frequencies", column=column) as s:
+        tokens = column_tokens(df_store, column)
+        s.items = len(tokens)
+        return Counter(tokens)
+
+
+def treemap_data(word_count, top_n=10):
+    """(sizes, labels) for the ``top_n`` most frequent words."""
+    most_common = word_count.most_common(top_n)
+    sizes = [count for _, count in most_common]
+    labels = [f"{word} ({count})" for word, count in most_common]
+    return sizes, labels
+
+
+###############################################
+# Images
+
+IMAGE_PATTERN = re.compile(r'https?://[\S]+\.(?:jpg|jpeg|png|gif)')
+
+
+def extract_image_links(df_store):
+    """All image links of a store, with the review text each link belongs to."""
+    with span("extract_image_links") as s:
+        image_links = df_store['Image_Links'].tolist()
+        reviews = df_store['Content'].fillna('').astype(str).tolist()
+        all_links, all_reviews = [], []
+        for idx, link_str in enumerate(image_links):
+            if isinstance(link_str, str):
+                links = IMAGE_PATTERN.findall(link_str)
+                all_links.extend(links)
+                all_reviews.extend([reviews[idx]] * len(links))
+        s.items = len(all_links)
+    return all_links, all_reviews
+
+
+###############################################
+# Network
+
+def network_slider_bounds(total_reviews):
+    """(min, max, default) of the minimum-word-frequency slider."""
+    min_value = max(1, total_reviews // 20)
+    max_value = max(2, total_reviews // 10)
+    return min_value, max_value, (min_value + max_value) // 2
+
+
+def cooccurrence_graph(token_lists, min_freq):
+    """Word co-occurrence graph of cleaned token lists; returns (graph, word_freq)."""
+    with span("cooccurrence") as s:
+        token_lists = list(token_lists)
+        word_freq = Counter(itertools.chain(*token_lists))
+        filtered_words = {w for w, c in word_freq.items() if c >= min_freq}
+
+        co_occurrence = defaultdict(int)
+        for tokens in token_lists:
+            kept = [w for w in tokens if w in filtered_words and w not in stopwords and len(w) > 1]
+            for pair in itertools.combinations(set(kept), 2):
+                co_occurrence[tuple(sorted(pair))] += 1
+
+        G = nx.Graph()
+        for (w1, w2), freq in co_occurrence.items():
+            G.add_edge(w1, w2, weight=freq)
+
+        G.remove_nodes_from(list(nx.isolates(G)))
+        s.items = len(token_lists)
+    return G, word_freq
+
+
+NETWORK_TOP_K = 60
+BACKBONE_ALPHA = 0.05
+
+
+def top_k_nodes(G, word_freq, k, by='frequency'):
+    """Subgraph of the ``k`` words with the highest frequency (or weighted degree, ``by='degree'``)."""
+    if G.number_of_nodes() <= k:
+        return G
+    score = dict(G.degree(weight='weight')) if by == 'degree' else {n: word_freq.get(n, 0) for n in G}
+    keep = heapq.nlargest(k, G.nodes(), key=lambda n: (score[n], n))
+    return G.subgraph(keep).copy()
+
+
+def disparity_backbone(G, alpha=BACKBONE_ALPHA):
+    """Edges that are significant at ``alpha`` for at least one endpoint (Serrano et al. disparity filter).
+
+    For a node with degree k and strength s, an edge of weight w has
+    p = (1 - w/s) ** (k - 1) under the null of uniformly spread weight.
+    """
+    if alpha >= 1 or G.number_of_edges() == 0:
+        return G
+    nodes = list(G.nodes())
+    index = {n: i for i, n in enumerate(nodes)}
+    edges = list(G.edges(data='weight'))
+    u = np.fromiter((index[a] for a, _, _ in edges), dtype=np.int64, count=len(edges))
+    v = np.fromiter((index[b] for _, b, _ in edges), dtype=np.int64, count=len(edges))
+    w = np.fromiter((d for _, _, d in edges), dtype=float, count=len(edges))
+    strength = np.bincount(u, w, len(nodes)) + np.bincount(v, w, len(nodes))
+    degree = np.bincount(u, minlength=len(nodes)) + np.bincount(v, minlength=len(nodes))
+
+    def p_value(end):
+        # Degree-1 endpoints give p = 1: their only edge says nothing on its own
+        return np.where(degree[end] > 1, (1 - w / strength[end]) ** (degree[end] - 1), 1.0)
+
+    keep = np.minimum(p_value(u), p_value(v)) < alpha
+    H = nx.Graph()
+    H.add_weighted_edges_from(e for e, k in zip(edges, keep) if k)
+    return H
+
+
+def reduce_network(G, word_freq, top_k=NETWORK_TOP_K, alpha=BACKBONE_ALPHA, by='frequency'):
+    """Top-K words, then the disparity backbone of their co-occurrences; isolates are dropped."""
+    with span("network_reduce") as s:
+        H = disparity_backbone(top_k_nodes(G, word_freq, top_k, by), alpha)
+        if H is G:
+            H = G.copy()
+        H.remove_nodes_from(list(nx.isolates(H)))
+        s.items = G.number_of_edges()
+    return H
+
+
+EXACT_BETWEENNESS_NODES = 300
+LOUVAIN_MAX_EDGES = 50_000
+NETWORK_METRICS_BUDGET = 2.0  # seconds, a soft limit (see ``network_metrics``)
+# Rough cost of Louvain and PageRank as multiples of label propagation on the same graph
+LOUVAIN_COST = 10
+PAGERANK_COST = 5
+
+
+def _pivot_betweenness(G, budget, seed, pass_seconds):
+    """Betweenness from as many BFS pivots as fit in ``budget`` seconds; returns (scores, method).
+
+    ``pass_seconds`` bounds the cost of one pivot. Degree centrality stands in
+    when not even one pivot fits.
+    """
+    n = G.number_of_nodes()
+    if n <= EXACT_BETWEENNESS_NODES and n * pass_seconds <= budget:
+        return nx.betweenness_centrality(G, seed=seed), 'exact'
+    # Time a small pilot, then size the real sample so the total stays within budget
+    pilot = min(n, 16, int(budget / pass_seconds)) if pass_seconds > 0 else min(n, 16)
+    if pilot < 1:
+        return nx.degree_centrality(G), 'degree'
+    started = time.perf_counter()
+    scores = nx.betweenness_centrality(G, k=pilot, seed=seed)
+    spent = time.perf_counter() - started
+    per_pivot = spent / pilot
+    k = min(n, int((budget - spent) / per_pivot)) if per_pivot > 0 else n
+    if k > pilot:
+        scores = nx.betweenness_centrality(G, k=k, seed=seed)
+    return scores, 'exact' if k >= n else f"k={max(k, pilot)}"
+
+
+def network_metrics(G, budget_seconds=NETWORK_METRICS_BUDGET, seed=42):
+    """Per-word PageRank, betweenness and community of a co-occurrence graph.
+
+    Returns (frame indexed by word, info). Label propagation always runs and
+    times one pass over the graph; the costlier metrics are estimated from it
+    and only run while they fit in the time budget: PageRank (else weighted
+    degree), Louvain communities (else the label propagation ones) and
+    betweenness, sampled from k pivots (else degree centrality). ``info``
+    records which method was used for each metric and the seconds spent.
+
+    The budget is soft: a networkx call cannot be stopped partway, label
+    propagation always runs, and the other stages are admitted on cost
+    estimates. A run can therefore overshoot by that pass plus the error of
+    the pilot-based betweenness estimate (a few tenths of a second at the
+    default budget). ``info['seconds']`` shows the actual time.
+    """
+    with span("network_metrics") as s:
+        started = time.perf_counter()
+
+        def remaining():
+            return budget_seconds - (time.perf_counter() - started)
+
+        info = {}
+        communities = nx.community.label_propagation_communities(G)
+        info['communities'] = 'label_propagation'
+        pass_seconds = time.perf_counter() - started
+
+        if PAGERANK_COST * pass_seconds <= remaining():
+            pagerank = nx.pagerank(G, weight='weight')
+            info['pagerank'] = 'pagerank'
+        else:
+            strength = dict(G.degree(weight='weight'))
+            total = sum(strength.values()) or 1
+            pagerank = {node: value / total for node, value in strength.items()}
+            info['pagerank'] = 'degree'
+
+        if G.number_of_edges() <= LOUVAIN_MAX_EDGES and LOUVAIN_COST * pass_seconds <= remaining():
+            communities = nx.community.louvain_communities(G, weight='weight', seed=seed)
+            info['communities'] = 'louvain'
+        # Community ids ordered by size, largest first
+        community = {node: cid for cid, members in enumerate(sorted(communities, key=len, reverse=True))
+                     for node in members}
+
+        betweenness, info['betweenness'] = _pivot_betweenness(G, remaining(), seed, pass_seconds)
+
+        metrics = pd.DataFrame({
+            'degree': dict(G.degree()),
+            'pagerank': pagerank,
+            'betweenness': betweenness,
+            'community': community,
+        })
+        info['seconds'] = time.perf_counter() - started
+        s.items = G.number_of_nodes()
+    return metrics, info
+
+
+def network_layout(G):
+    with span("spring_layout") as s:
+        pos = nx.spring_layout(G, k=0.5, seed=42)
+        s.items = G.number_of_nodes()
+    return pos
+
+
+def frequency_colors(G, word_freq):
+    """Green/crimson/skyblue for the top 30%, bottom 30% and middle word frequencies."""
+    freq_dict = {node: word_freq.get(node, 0) for node in G.nodes()}
+    freq_values = list(freq_dict.values())
+    upper_thresh = np.percentile(freq_values, 70)
+    lower_thresh = np.percentile(freq_values, 30)
+
+    def get_color(freq):
+        if freq >= upper_thresh:
+            return 'green'
+        elif freq <= lower_thresh:
+            return 'crimson'
+        else:
+            return 'skyblue'
+
+    return [get_color(freq_dict[n]) for n in G.nodes()]
+
+
+###############################################
+# Topic modeling
+
+LDA_SAMPLE_SIZE = 300
+
+
+def lda_inputs(df_store, sample_size=LDA_SAMPLE_SIZE):
+    """Gensim dictionary and bag-of-words corpus of (a sample of) the store's reviews."""
+    from gensim import corpora
+
+    with span("lda_corpus") as s:
+        if len(df_store) > sample_size:
+            df_store = df_store.sample(sample_size, random_state=42)
+        token_lists = clean_token_column(df_store['Tokens']).tolist()
+        dictionary = corpora.Dictionary(token_lists)
+        corpus = [dictionary.doc2bow(text) for text in token_lists]
+        s.items = len(corpus)
+    return dictionary, corpus
+
+
+def train_lda(corpus, dictionary, num_topics=10):
+    from gensim.models import LdaModel
+
+    with span("lda_train") as s:
+        s.items = len(corpus)
+        return LdaModel(corpus, num_topics=num_topics, id2word=dictionary, passes=5)
+
+
+def lda_topics(model, num_words=10):
+    """Top words per topic as a long frame (topic, word, weight)."""
+    rows = []
+    for topic_id in range(model.num_topics):
+        for word, weight in model.show_topic(topic_id, topn=num_words):
+            rows.append((topic_id, word, float(weight)))
+    return pd.DataFrame(rows, columns=['topic', 'word', 'weight'])
+
+
+###############################################
+# Sentiment
+
+def sentiment_score(result):
+    """Probability of the positive label from one pipeline result."""
+    return result['score'] if result['label'] == 'LABEL_1' else 1 - result['score']
+
+
+def compute_sentiment(text, classifier):
+    if not isinstance(text, str):
+        text = str(text)
+    return sentiment_score(classifier(text)[0])
+
+
+def score_texts(texts, classifier, batch_size=32, progress=None):
+    """Score texts in batches; ``progress(done)`` is called after every batch.
+
+    ``classifier`` is a transformers pipeline (or anything called the same way),
+    or an object with ``score(texts, progress)`` such as ``dcx_inference.InferencePool``.
+    """
+    if hasattr(classifier, 'score'):
+        return classifier.score(texts, progress)
+    scores = []
+    with span("sentiment_inference") as s:
+        s.items = len(texts)
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            scores.extend(sentiment_score(r) for r in classifier(batch))
+            if progress is not None:
+                progress(len(scores))
+    return scores
+
+
+SENTIMENT_COLUMNS = ['review_sentences'] + KEYWORD_COLUMNS_EN
+
+
+def sentiment_inputs(df_store):
+    """Texts for the overall score (``review_sentences``) and each keyword column, indexed like ``df_store``."""
+    return {col: df_store[col].dropna().astype(str) for col in SENTIMENT_COLUMNS}
+
+
+def normalize_sentiment_text(text):
+    """Text with whitespace runs collapsed and trimmed: inputs equal after this share one score.
+
+    The classifier's tokenizer splits on whitespace, so this never changes a score.
+    """
+    return ' '.join(str(text).split())
+
+
+class ScoringPlan:
+    """One classifier pass over the distinct texts of several sentiment inputs.
+
+    ``inputs`` maps any key (a sentiment column, or ``(store, column)``) to a
+    Series of texts. Texts are normalized and deduplicated across all inputs,
+    so a keyword snippet that repeats a review sentence, or a phrase shared by
+    many reviews, is encoded once and its score mapped back to every place it
+    occurs. Scores are kept, so texts scored by an earlier call (an earlier
+    sampling round) are not sent again.
+    """
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        combined = pd.concat(list(inputs.values()), ignore_index=True) if inputs else pd.Series([], dtype=object)
+        codes, uniques = pd.factorize(combined.map(normalize_sentiment_text))
+        self.texts = list(uniques)  # what the classifier sees
+        self.codes = {}             # input key -> position of each text in ``self.texts``
+        start = 0
+        for key, texts in inputs.items():
+            self.codes[key] = codes[start:start + len(texts)]
+            start += len(texts)
+        self.scores = np.full(len(self.texts), np.nan)
+        self.requested = 0  # texts asked for
+        self.encoded = 0    # texts actually sent to the classifier
+
+    def __len__(self):
+        return len(self.texts)
+
+    @property
+    def total_texts(self):
+        return sum(len(codes) for codes in self.codes.values())
+
+    @property
+    def calls_saved(self):
+        return self.requested - self.encoded
+
+    def score_codes(self, codes, classifier, batch_size=32, progress=None):
+        """Scores of the texts at ``codes``, encoding only those not scored yet; ``progress`` counts those."""
+        codes = np.asarray(codes, dtype=np.int64)
+        todo = np.unique(codes[np.isnan(self.scores[codes])])
+        if len(todo):
+            self.scores[todo] = score_texts([self.texts[i] for i in todo], classifier, batch_size, progress)
+        self.requested += len(codes)
+        self.encoded += len(todo)
+        REGISTRY.inc("dcx_sentiment_calls_saved_total", len(codes) - len(todo))
+        return self.scores[codes]
+
+    def score(self, classifier, batch_size=32, progress=None):
+        """Per-text scores of every input, indexed like it; ``progress(done)`` counts distinct texts."""
+        with span("sentiment_plan") as s:
+            codes = list(self.codes.values())
+            self.score_codes(np.concatenate(codes) if codes else [], classifier, batch_size, progress)
+            s.items = len(self.texts)
+        return {key: pd.Series(self.scores[self.codes[key]], index=texts.index, dtype=float)
+                for key, texts in self.inputs.items()}
+
+
+def score_columns(df_store, classifier, batch_size=32, progress=None):
+    """Per-text scores of every sentiment column, each distinct text scored once (see ``ScoringPlan``)."""
+    return ScoringPlan(sentiment_inputs(df_store)).score(classifier, batch_size, progress)
+
+
+def summarize_sentiment(column_scores):
+    """Overall and per-keyword sentiment (0-100) from per-text scores."""
+    def mean(scores):
+        return float(np.mean(scores)) * 100 if len(scores) else None
+
+    return {
+        'total': mean(column_scores['review_sentences']),
+        'keywords': {col: mean(column_scores[col]) for col in KEYWORD_COLUMNS_EN}
+    }
+
+
+def store_sentiment(df_store, classifier, batch_size=32, progress=None):
+    """Overall and per-keyword sentiment (0-100) of a store, as shown on the dashboard."""
+    return summarize_sentiment(score_columns(df_store, classifier, batch_size, progress))
+
+
+Z_95 = 1.959964
+FIRST_SAMPLE = 64
+# Default 95% half-width (points) of the sampled estimates. At ±1 a store of
+# 8k reviews needs ~64% of its texts; at ±2, ~27%.
+SENTIMENT_TARGET = 2.0
+
+
+def stratified_order(strata, seed=42):
+    """A random order of ``strata`` codes in which every prefix is (nearly) proportionally stratified."""
+    rng = np.random.default_rng(seed)
+    strata = np.asarray(strata)
+    shuffled = rng.permutation(len(strata))
+    # Position of each item within its (shuffled) stratum, spread over [0, 1)
+    codes = strata[shuffled]
+    order = np.argsort(codes, kind='stable')
+    sizes = np.bincount(codes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank = np.empty(len(codes), dtype=float)
+    rank[order] = np.arange(len(codes)) - np.repeat(starts, sizes)
+    key = (rank + rng.random(len(codes))) / sizes[codes]
+    return shuffled[np.argsort(key, kind='stable')]
+
+
+class SentimentSampler:
+    """Progressively scored sentiment with stratified-sample estimates and 95% confidence intervals.
+
+    Each sentiment column is scored in a stratified random order (strata are
+    review months), so every prefix is a proportional sample and the running
+    estimate is the stratum-weighted mean with a finite-population-corrected
+    interval. Texts go through a shared ``ScoringPlan``, so a text drawn for
+    several columns (or rounds) is encoded once. Once every text is scored,
+    ``column_scores`` is exactly what ``score_columns`` returns, so the final
+    numbers match the exact mode.
+    """
+
+    def __init__(self, df_store, seed=42):
+        months = pd.to_datetime(df_store['Date'], errors='coerce').dt.to_period('M')
+        self.texts, self.order, self.strata, self.scores = {}, {}, {}, {}
+        inputs = sentiment_inputs(df_store)
+        self.plan = ScoringPlan(inputs)
+        for col, texts in inputs.items():
+            strata = pd.factorize(months.reindex(texts.index), use_na_sentinel=False)[0] if len(texts) else []
+            self.texts[col] = texts
+            self.strata[col] = np.asarray(strata, dtype=np.int64)
+            self.order[col] = stratified_order(self.strata[col], seed) if len(texts) else np.empty(0, dtype=int)
+            self.scores[col] = np.full(len(texts), np.nan)
+        self.scored = dict.fromkeys(self.texts, 0)  # prefix of ``order`` that is scored
+
+    @property
+    def total_texts(self):
+        return sum(len(t) for t in self.texts.values())
+
+    @property
+    def scored_texts(self):
+        return sum(self.scored.values())
+
+    @property
+    def calls_saved(self):
+        return self.plan.calls_saved
+
+    def complete(self, col=None):
+        cols = self.texts if col is None else [col]
+        return all(self.scored[c] == len(self.texts[c]) for c in cols)
+
+    def estimate(self, col):
+        """(estimate, 95% half-width) on the 0-100 scale; (None, None) before anything is scored."""
+        n, N = self.scored[col], len(self.texts[col])
+        if n == 0:
+            return None, None
+        picked = self.order[col][:n]
+        scores, strata = self.scores[col][picked], self.strata[col][picked]
+        if n == N:
+            return float(np.mean(self.scores[col])) * 100, 0.0
+        sizes = np.bincount(self.strata[col]).astype(float)
+        n_h = np.bincount(strata, minlength=len(sizes)).astype(float)
+        sums = np.bincount(strata, scores, minlength=len(sizes))
+        seen = n_h > 0
+        means = np.divide(sums, n_h, out=np.zeros_like(sums), where=seen)
+        weights = np.where(seen, sizes, 0) / sizes[seen].sum()
+        estimate = float(weights @ means)
+        # Strata with fewer than two samples borrow the pooled variance
+        pooled = float(np.var(scores, ddof=1)) if n > 1 else 0.25
+        squares = np.bincount(strata, (scores - means[strata]) ** 2, minlength=len(sizes))
+        var_h = np.where(n_h > 1, squares / np.maximum(n_h - 1, 1), pooled)
+        fpc = np.where(seen, 1 - n_h / np.maximum(sizes, 1), 0)
+        variance = float(np.sum(weights ** 2 * fpc * var_h / np.maximum(n_h, 1)))
+        return estimate * 100, Z_95 * np.sqrt(variance) * 100
+
+    def estimates(self):
+        """``{'total': (est, half), 'keywords': {col: (est, half)}}`` like ``summarize_sentiment``."""
+        return {
+            'total': self.estimate('review_sentences'),
+            'keywords': {col: self.estimate(col) for col in KEYWORD_COLUMNS_EN},
+        }
+
+    def converged(self, target_half_width):
+        for col in self.texts:
+            est, half = self.estimate(col)
+            if not self.complete(col) and (half is None or half > target_half_width):
+                return False
+        return True
+
+    def refine(self, classifier, target_half_width=None, batch_size=32):
+        """Score the next round of texts; returns how many were scored.
+
+        Columns whose interval is already within ``target_half_width`` are
+        skipped (``None`` scores towards the exact result). Each round doubles
+        a column's sample.
+        """
+        batch, slices = [], []  # ``batch`` holds plan codes
+        for col, texts in self.texts.items():
+            n, N = self.scored[col], len(texts)
+            if n == N:
+                continue
+            if target_half_width is not None and n:
+                half = self.estimate(col)[1]
+                if half is not None and half <= target_half_width:
+                    continue
+            upto = min(N, max(FIRST_SAMPLE, 2 * n))
+            rows = self.order[col][n:upto]
+            slices.append((col, rows, len(batch), len(batch) + len(rows)))
+            batch.extend(self.plan.codes[col][rows])
+        if not batch:
+            return 0
+        with span("sentiment_refine") as s:
+            scores = self.plan.score_codes(batch, classifier, batch_size)
+            s.items = len(batch)
+        for col, rows, start, end in slices:
+            self.scores[col][rows] = scores[start:end]
+            self.scored[col] += len(rows)
+        return len(batch)
+
+    def column_scores(self):
+        """Per-text scores like ``score_columns``; only valid once ``complete()``."""
+        return {col: pd.Series(self.scores[col], index=texts.index, dtype=float) for col, texts in self.texts.items()}
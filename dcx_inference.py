@@ -0,0 +1,128 @@
+"""Multi-process sentiment inference with copy-on-write model sharing.
+
+The classifier is loaded once in the parent and the worker processes are
+forked from it, so they share the model weights copy-on-write instead of each
+loading their own copy. Each worker pins torch to ``threads_per_worker``
+intra-op threads, which scales much better on many-core CPUs than one process
+with many threads for short sentences.
+
+Texts are split into shards, scored in parallel and reassembled in order. A
+shard that raises is retried; if a worker dies the pool is rebuilt and the
+unfinished shards are resubmitted. Shards that keep failing are scored in the
+parent process, so a call always returns one score per text.
+
+Create the pool before running any inference in the parent: forking after
+torch has started its OpenMP threads can hang the children.
+"""
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from dcx_core import score_texts
+from dcx_metrics import REGISTRY, span
+
+# Set in the parent before forking; inherited by the workers
+_MODEL = None
+
+
+def _init_worker(threads):
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:  # stub classifiers in tests/benchmarks
+        pass
+
+
+def _score_shard(texts, batch_size):
+    return score_texts(texts, _MODEL, batch_size)
+
+
+class InferencePool:
+    def __init__(self, classifier, workers=None, threads_per_worker=1, batch_size=32, shard_size=256,
+                 max_attempts=2):
+        global _MODEL
+        if "fork" not in mp.get_all_start_methods():
+            raise RuntimeError("InferencePool needs the 'fork' start method to share the model")
+        _MODEL = classifier
+        self.classifier = classifier
+        self.workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.threads_per_worker = threads_per_worker
+        self.batch_size = batch_size
+        self.shard_size = shard_size
+        self.max_attempts = max_attempts
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("fork"),
+                                             initializer=_init_worker, initargs=(self.threads_per_worker,))
+        return self._pool
+
+    def start(self):
+        """Fork the workers now (with 'fork', the executor launches all of them on first submit)."""
+        self._executor().submit(os.getpid).result()
+        return self
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def score(self, texts, progress=None):
+        """Scores for ``texts`` in input order; ``progress(done)`` counts finished texts."""
+        texts = list(texts)
+        shards = {i: texts[start:start + self.shard_size]
+                  for i, start in enumerate(range(0, len(texts), self.shard_size))}
+        results = {}
+        attempts = dict.fromkeys(shards, 0)
+        done = 0
+
+        def finish(shard_id, scores):
+            nonlocal done
+            results[shard_id] = scores
+            done += len(scores)
+            if progress is not None:
+                progress(done)
+
+        with span("sentiment_inference_pool", workers=self.workers) as s:
+            s.items = len(texts)
+            while len(results) < len(shards):
+                pending = [i for i in shards if i not in results]
+                # Shards that already failed too often are scored here rather than lost
+                for shard_id in [i for i in pending if attempts[i] >= self.max_attempts]:
+                    REGISTRY.inc("dcx_inference_fallback_shards_total")
+                    finish(shard_id, score_texts(shards[shard_id], self.classifier, self.batch_size))
+                pending = [i for i in pending if i not in results]
+                if not pending:
+                    break
+
+                pool = self._executor()
+                futures = {pool.submit(_score_shard, shards[i], self.batch_size): i for i in pending}
+                try:
+                    for future in as_completed(futures):
+                        shard_id = futures[future]
+                        try:
+                            finish(shard_id, future.result())
+                        except BrokenProcessPool:
+                            raise
+                        except Exception:
+                            attempts[shard_id] += 1
+                            REGISTRY.inc("dcx_inference_shard_errors_total")
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed): rebuild the pool, retry what is left
+                    REGISTRY.inc("dcx_inference_pool_restarts_total")
+                    for shard_id in futures.values():
+                        if shard_id not in results:
+                            attempts[shard_id] += 1
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+
+        return [score for i in range(len(shards)) for score in results[i]]
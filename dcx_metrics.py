@@ -0,0 +1,168 @@
+"""Lightweight timing/metrics for the DCX tool.
+
+Stages are timed with ``span``; every observation lands in a rolling window
+per series and is exported in the Prometheus text format, either to a file
+(``DCX_METRICS_FILE``) or over a tiny local HTTP endpoint (``DCX_METRICS_PORT``).
+"""
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+WINDOW_SIZE = 1024
+QUANTILES = (0.5, 0.9, 0.99)
+METRICS_FILE = os.environ.get("DCX_METRICS_FILE", ".dcx_metrics.prom")
+
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    parts = []
+    for k, v in sorted(labels):
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class RollingSummary:
+    """Cumulative sum/count plus a bounded window of recent samples for quantiles."""
+
+    def __init__(self, window=WINDOW_SIZE):
+        self.window = deque(maxlen=window)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.window.append(value)
+        self.total += value
+        self.count += 1
+
+    def quantiles(self, qs=QUANTILES):
+        if not self.window:
+            return {q: float("nan") for q in qs}
+        values = np.quantile(np.fromiter(self.window, dtype=float), qs)
+        return dict(zip(qs, values))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._summaries = defaultdict(RollingSummary)   # (metric, labels) -> RollingSummary
+        self._counters = defaultdict(float)              # (metric, labels) -> value
+        self._local = threading.local()
+
+    # --- recording ---
+    def observe(self, metric, value, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._summaries[key].observe(float(value))
+
+    def inc(self, metric, value=1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Time a block; set ``s.items`` inside the block to record an item count."""
+        record = _Span(stage)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            self.observe("dcx_stage_seconds", record.seconds, stage=stage, **labels)
+            if record.items is not None:
+                self.observe("dcx_stage_items", record.items, stage=stage, **labels)
+            breakdown = getattr(self._local, "breakdown", None)
+            if breakdown is not None:
+                breakdown.append(record)
+
+    def cache_request(self, cache):
+        self.inc("dcx_cache_requests_total", cache=cache)
+
+    def cache_miss(self, cache):
+        self.inc("dcx_cache_misses_total", cache=cache)
+
+    def cache_hit_rate(self, cache):
+        requests = self._counters.get(("dcx_cache_requests_total", (("cache", cache),)), 0)
+        misses = self._counters.get(("dcx_cache_misses_total", (("cache", cache),)), 0)
+        return None if not requests else max(0.0, 1 - misses / requests)
+
+    # --- per-rerun breakdown (one per Streamlit script thread) ---
+    def begin_rerun(self):
+        self._local.breakdown = []
+        self._local.started = time.perf_counter()
+
+    def rerun_breakdown(self):
+        """Spans recorded on this thread since ``begin_rerun`` as (stage, seconds, items)."""
+        return [(r.stage, r.seconds, r.items) for r in getattr(self._local, "breakdown", [])]
+
+    def rerun_seconds(self):
+        started = getattr(self._local, "started", None)
+        return None if started is None else time.perf_counter() - started
+
+    # --- export ---
+    def to_prometheus(self):
+        with self._lock:
+            summaries = {k: (v.total, v.count, v.quantiles()) for k, v in self._summaries.items()}
+            counters = dict(self._counters)
+        lines = []
+        for metric in sorted({m for m, _ in summaries}):
+            lines.append(f"# TYPE {metric} summary")
+            for (m, labels), (total, count, qs) in sorted(summaries.items()):
+                if m != metric:
+                    continue
+                for q, value in qs.items():
+                    lines.append(f"{metric}{_label_str(labels + (('quantile', q),))} {value:.6g}")
+                lines.append(f"{metric}_sum{_label_str(labels)} {total:.6g}")
+                lines.append(f"{metric}_count{_label_str(labels)} {count}")
+        for metric in sorted({m for m, _ in counters}):
+            lines.append(f"# TYPE {metric} counter")
+            for (m, labels), value in sorted(counters.items()):
+                if m == metric:
+                    lines.append(f"{metric}{_label_str(labels)} {value:.6g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=METRICS_FILE):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Expose ``/metrics`` on a daemon thread; returns the server."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200 if self.path.startswith("/metrics") else 404)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class _Span:
+    __slots__ = ("stage", "seconds", "items")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.seconds = 0.0
+        self.items = None
+
+
+REGISTRY = MetricsRegistry()
+span = REGISTRY.span
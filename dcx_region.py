@@ -0,0 +1,226 @@
+"""A region's reviews and the indexes built from them, refreshed by delta.
+
+``Region.refresh`` reads only the rows of a newer export that are past the
+ones already loaded (or, for a delta file, dated on or after the latest
+review, minus the reviews of that day that are already loaded),
+appends them verbatim to the local cache file and folds them into the store
+catalog, the similar-stores index, the search index and the rollups. Only
+the new rows are parsed, hashed and tokenized. What is left is vectorized
+array work over the existing indexes: the store catalog re-ranks every
+store, the similar-stores TF-IDF matrix is rebuilt over all stores (both
+O(stores)), and the search index copies its postings into the merged
+layout and is saved again (O(indexed terms)). A refresh is therefore far
+cheaper than a reload but not free of the region's size;
+``benchmarks/bench_refresh.py`` measures it against the delta size and the
+store count.
+
+Each store keeps an additive content fingerprint that is updated from the
+delta alone; cache and artifact keys built from it change only for stores
+that received reviews, so every other store keeps its cached outputs.
+"""
+import csv
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+
+from dcx_artifacts import file_digest
+from dcx_catalog import StoreCatalog
+from dcx_core import (
+    FINGERPRINT_COLUMNS, download_dataset, load_frame, read_delta, normalize_delta, row_hashes, store_fingerprints,
+    add_fingerprints
+)
+from dcx_metrics import REGISTRY, span
+from dcx_rollups import Rollups
+from dcx_search import SearchIndex
+from dcx_similar import SimilarStores
+
+
+# Identifies a review when skipping the already loaded ones of the latest day
+ROW_COLUMNS = ['Name'] + FINGERPRINT_COLUMNS
+
+
+def rollups_path(dataset_name):
+    return f".rollups_{dataset_name}.pkl"
+
+
+def search_index_path(dataset_name):
+    return f".search_{dataset_name}.npz"
+
+
+class Region:
+    def __init__(self, dataset_name):
+        self.name = dataset_name
+        self.path = download_dataset(dataset_name)
+        self._digest = file_digest(self.path)
+        self._rows = load_frame(self.path)  # appending costs only the appended rows
+        self.fingerprints = {store: int(fp) for store, fp in store_fingerprints(self.df).items()}
+        self.version = 0  # bumped by every refresh that added rows
+        self._edge = None  # (latest date, Counter of the row hashes of the reviews dated then)
+        # Built on first use, then kept up to date by refresh
+        self._catalog = self._similar = self._search = self._rollups = None
+        self._lock = threading.RLock()
+
+    @property
+    def df(self):
+        return self._rows.frame
+
+    @property
+    def checksum(self):
+        """Digest of the local cache file, extended (not recomputed) as rows are appended."""
+        return self._digest.hexdigest()
+
+    def fingerprint(self, store):
+        return f"{self.fingerprints.get(store, 0):016x}"
+
+    # --- derived indexes ---
+    def _derived(self, name, build):
+        REGISTRY.cache_request(f"region_{name}")
+        value = getattr(self, f"_{name}")
+        if value is None:
+            with self._lock:
+                value = getattr(self, f"_{name}")
+                if value is None:
+                    REGISTRY.cache_miss(f"region_{name}")
+                    value = build()
+                    setattr(self, f"_{name}", value)
+        return value
+
+    @property
+    def catalog(self) -> StoreCatalog:
+        return self._derived("catalog", lambda: StoreCatalog.build(self.df))
+
+    @property
+    def rollups(self) -> Rollups:
+        return self._derived("rollups", self._load_rollups)
+
+    @property
+    def similar(self) -> SimilarStores:
+        return self._derived("similar", self._build_similar)
+
+    @property
+    def search(self) -> SearchIndex:
+        return self._derived("search", self._load_search)
+
+    def _load_rollups(self):
+        path = rollups_path(self.name)
+        rollups = Rollups.load(path) if os.path.exists(path) else Rollups()
+        if rollups.update(self.df):  # only months newer than the stored watermark
+            rollups.save(path)
+        return rollups
+
+    def save_rollups(self):
+        self.rollups.save(rollups_path(self.name))
+
+    def _build_similar(self):
+        index = SimilarStores()
+        index.sync(self.df, self.fingerprints)
+        index.set_aspect_scores(self.rollups.keyword_sentiment_by_store())
+        return index
+
+    def _load_search(self):
+        path = search_index_path(self.name)
+        if os.path.exists(path):
+            index = SearchIndex.load(path)
+            if index.checksum == self.checksum and len(index) == len(self.df):
+                return index
+        index = SearchIndex.build(self.df, self.checksum)
+        index.save(path)
+        return index
+
+    # --- refresh ---
+    def refresh(self, source=None, by_date=False):
+        """Fold new reviews into the dataset and every built index; returns the stores that received any.
+
+        ``source`` is a newer export of the whole region (downloaded afresh by
+        default) whose first rows are the ones already loaded. With
+        ``by_date`` it is a delta file instead: rows dated on or after the
+        latest loaded review are taken, except those of that day that are
+        already loaded.
+        """
+        fetched = source is None
+        if fetched:
+            source = download_dataset(self.name, fresh=True)
+        try:
+            with self._lock, span("region_refresh", dataset=self.name) as s:
+                if by_date:
+                    since = self.df['Date'].max()
+                    raw = read_delta(source, since=since)
+                    delta = normalize_delta(raw)
+                    raw, delta = self._drop_loaded(raw, delta, since)
+                else:
+                    raw = read_delta(source, skip_rows=len(self.df))
+                    delta = normalize_delta(raw)
+                s.items = len(raw)
+                if raw.empty:
+                    return []
+                rollups = self.rollups  # loaded before the append, so the delta is folded in exactly once
+                self._append_raw(raw)
+                self._advance_edge(delta)
+
+                changed = store_fingerprints(delta)
+                self.fingerprints = add_fingerprints(self.fingerprints, changed)
+                self._rows.append(delta)
+                rollups.append(delta)
+                self.save_rollups()
+                if self._catalog is not None:
+                    self._catalog = self._catalog.extend(delta)
+                if self._similar is not None:
+                    self._similar.add(delta, self.fingerprints)
+                if self._search is not None:
+                    self._search = self._search.extend(delta, self.checksum)
+                    self._search.save(search_index_path(self.name))
+                self.version += 1
+                REGISTRY.inc("dcx_refresh_rows_total", len(delta), dataset=self.name)
+        finally:
+            if fetched:
+                os.remove(source)
+        return sorted(changed.index)
+
+    def _loaded_at(self, date):
+        """Counted row hashes of the loaded reviews dated ``date``, the latest date."""
+        if self._edge is None or self._edge[0] != date:
+            self._edge = (date, Counter(row_hashes(self.df[self.df['Date'] == date], ROW_COLUMNS).tolist()))
+        return self._edge[1]
+
+    def _drop_loaded(self, raw, delta, since):
+        """Drop the delta rows dated ``since`` that are already loaded (each loaded copy drops one)."""
+        at_edge = np.flatnonzero((delta['Date'] == since).to_numpy())
+        if not len(at_edge):
+            return raw, delta
+        loaded = Counter(self._loaded_at(since))
+        hashes = row_hashes(delta.iloc[at_edge], ROW_COLUMNS).tolist()
+        keep = np.ones(len(delta), dtype=bool)
+        for i, h in zip(at_edge, hashes):
+            if loaded[h] > 0:
+                loaded[h] -= 1
+                keep[i] = False
+        return raw[keep].reset_index(drop=True), delta[keep].reset_index(drop=True)
+
+    def _advance_edge(self, delta):
+        """Keep the latest-day row hashes current with the appended ``delta``."""
+        if self._edge is None:
+            return
+        date, counts = self._edge
+        latest = delta['Date'].max()
+        if latest > date:
+            # Every review of a later day is in the delta
+            self._edge = (latest, Counter(row_hashes(delta[delta['Date'] == latest], ROW_COLUMNS).tolist()))
+        elif latest == date:
+            counts.update(row_hashes(delta[delta['Date'] == date], ROW_COLUMNS).tolist())
+
+    def _append_raw(self, raw):
+        """Append the raw delta rows to the local cache file, so a restart loads them too."""
+        with open(self.path, "rb+") as f:
+            header = f.readline().decode("utf-8-sig").rstrip("\r\n")
+            columns = next(csv.reader([header]))
+            block = raw.reindex(columns=columns).to_csv(index=False, header=False, lineterminator="\n")
+            block = block.encode("utf-8")
+            f.seek(0, os.SEEK_END)
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    block = b"\n" + block
+            f.write(block)
+        self._digest.update(block)
@@ -0,0 +1,136 @@
+"""Matplotlib/WordCloud figure builders shared by the app and the batch CLI."""
+import io
+import os
+from random import choice
+
+import matplotlib as mpl
+import matplotlib.font_manager as fm
+import matplotlib.pyplot as plt
+import networkx as nx
+import squarify
+from wordcloud import WordCloud
+
+from dcx_metrics import span
+
+FONT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "NanumGothic-Regular.ttf")
+font_prop = fm.FontProperties(fname=FONT_PATH)
+fm.fontManager.addfont(FONT_PATH)
+font_name = font_prop.get_name()
+mpl.rcParams['font.family'] = font_name
+mpl.rcParams['axes.unicode_minus'] = False
+
+# Define vivid color list
+VIVID_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#e31a1c", "#17becf"]
+
+
+# Random color function
+def vivid_color_func(*args, **kwargs):
+    return choice(VIVID_COLORS)
+
+
+# Progressive wordcloud tiers: a quick preview, the on-screen image, and the
+# full-resolution image used only for downloads and batch exports.
+WORDCLOUD_TIERS = {
+    'preview': {'width': 200, 'height': 200, 'max_words': 50, 'contour_width': 0.5},
+    'display': {'width': 400, 'height': 400, 'max_words': 120, 'contour_width': 1.0},
+    'full': {'width': 800, 'height': 800, 'max_words': 200, 'contour_width': 1.8},
+}
+
+
+def wordcloud_frequencies(text):
+    """Word weights exactly as ``WordCloud.generate`` computes them, so every tier shares one pass."""
+    with span("wordcloud_frequencies") as s:
+        frequencies = WordCloud(collocations=False).process_text(text)
+        s.items = len(frequencies)
+    return frequencies
+
+
+def make_wordcloud(text, width=800, height=800, contour_width=1.8, max_words=200, frequencies=None):
+    with span("wordcloud_generate", size=width) as s:
+        wordcloud = WordCloud(
+            font_path=FONT_PATH,
+            width=width,
+            height=height,
+            max_words=max_words,
+            contour_width=contour_width,
+            contour_color='black',
+            background_color='white',
+            mode='RGB',
+            color_func=vivid_color_func,
+            collocations=False
+        )
+        if frequencies is None:
+            wordcloud.generate(text)
+        else:
+            wordcloud.generate_from_frequencies(frequencies)
+        s.items = len(wordcloud.words_)
+    return wordcloud
+
+
+def wordcloud_png(frequencies, tier='full'):
+    """PNG bytes of one wordcloud tier, straight from the WordCloud canvas (no matplotlib resampling)."""
+    wordcloud = make_wordcloud(None, frequencies=frequencies, **WORDCLOUD_TIERS[tier])
+    buf = io.BytesIO()
+    wordcloud.to_image().save(buf, format='PNG', optimize=tier != 'preview')
+    return buf.getvalue()
+
+
+def wordcloud_figure(wordcloud):
+    fig, ax = plt.subplots(figsize=(5, 5), dpi=150)
+    ax.imshow(wordcloud, interpolation='nearest')
+    ax.axis('off')
+    return fig
+
+
+def treemap_figure(sizes, labels):
+    cmap = plt.cm.get_cmap("Blues")
+    normed_sizes = [s / max(sizes) for s in sizes]
+    colors = [cmap(0.3 + 0.7 * s) for s in normed_sizes]
+
+    fig, ax = plt.subplots(figsize=(4, 4))
+    squarify.plot(sizes=sizes, label=labels, color=colors, alpha=0.85, ax=ax, text_kwargs={'fontsize': 10})
+    ax.axis('off')
+    return fig
+
+
+def metric_colors(values, categorical=False):
+    """Hex colors for per-node metric values: a qualitative palette for ids, a sequential map otherwise."""
+    values = list(values)
+    if categorical:
+        palette = mpl.colormaps["tab20"].colors
+        return [mpl.colors.to_hex(palette[int(v) % len(palette)]) for v in values]
+    lo, hi = min(values, default=0), max(values, default=0)
+    cmap = mpl.colormaps["viridis_r"]
+    return [mpl.colors.to_hex(cmap(0.1 + 0.8 * ((v - lo) / (hi - lo) if hi > lo else 0.5))) for v in values]
+
+
+def metric_sizes(values, smallest=600, largest=4000):
+    """Node sizes scaled linearly between ``smallest`` and ``largest`` by metric value."""
+    values = list(values)
+    lo, hi = min(values, default=0), max(values, default=0)
+    return [smallest + (largest - smallest) * ((v - lo) / (hi - lo) if hi > lo else 0.5) for v in values]
+
+
+def network_figure(G, pos, node_colors, title, node_sizes=None):
+    with span("network_render") as s:
+        fig, ax = plt.subplots(figsize=(8, 7))
+        fig.subplots_adjust(top=0.88, bottom=0.15)
+        if node_sizes is None:
+            node_sizes = [1000 + len(n) * 250 for n in G.nodes()]
+
+        nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=node_sizes, ax=ax)
+        nx.draw_networkx_edges(G, pos, edge_color='lightgray', ax=ax, alpha=0.5)
+        nx.draw_networkx_labels(G, pos, font_size=12, font_family=font_name, ax=ax)
+
+        ax.set_title(title, fontproperties=font_prop, fontsize=16, pad=12)
+        ax.axis('off')
+        s.items = G.number_of_edges()
+    return fig
+
+
+def figure_png(fig, dpi=None):
+    """PNG bytes of a figure; closes the figure."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi or fig.dpi, bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
@@ -0,0 +1,194 @@
+"""Per-store, per-month rollups of the review data.
+
+Trend charts and time-window filters read these small tables instead of
+rescanning raw reviews. ``Rollups.update`` folds in only rows newer than the
+last seen ``Date`` (rows dated on the watermark day itself are assumed to be
+in already), ``Rollups.append`` folds in rows known to be new (a refresh
+delta) whatever their date; ``Rollups.set_sentiment`` records per-month score sums when a
+store is scored. Writers replace the tables wholesale under a lock, so readers
+on other Streamlit sessions never see a half-updated frame.
+"""
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from dcx_core import SENTIMENT_COLUMNS, KEYWORD_COLUMNS_EN, IMAGE_PATTERN, column_tokens
+from dcx_metrics import span
+
+TOP_TERMS = 50
+MONTH_KEY = ['Name', 'month']
+COUNT_COLUMNS = ['reviews', 'images', 'content_chars']
+SENTIMENT_SUM_COLUMNS = [f"sent_sum_{c}" for c in SENTIMENT_COLUMNS]
+SENTIMENT_N_COLUMNS = [f"sent_n_{c}" for c in SENTIMENT_COLUMNS]
+
+
+def review_months(df):
+    """Review month as a ``Period[M]`` series; unparseable dates become NaT."""
+    return pd.to_datetime(df['Date'], errors='coerce').dt.to_period('M')
+
+
+def _month_counts(df):
+    months = review_months(df)
+    content = df['Content'].fillna('').astype(str)
+    if 'Image_Count' in df:
+        images = df['Image_Count']
+    else:
+        images = df['Image_Links'].map(lambda s: len(IMAGE_PATTERN.findall(s)) if isinstance(s, str) else 0)
+    frame = pd.DataFrame({
+        'Name': df['Name'].astype(str).values,
+        'month': months.values,
+        'reviews': 1,
+        'images': images.astype(int).values,
+        'content_chars': content.str.len().astype(int).values,
+    })
+    frame = frame.dropna(subset=['month'])
+    return frame.groupby(MONTH_KEY, observed=True)[COUNT_COLUMNS].sum()
+
+
+TERM_DTYPES = {'Name': object, 'month': pd.PeriodDtype('M'), 'word': object, 'count': 'int64'}
+
+
+def _typed_terms(terms):
+    # An empty or object-typed ``count`` would make ``nlargest`` in ``top_terms`` fail
+    return terms.astype(TERM_DTYPES)
+
+
+def _month_terms(df, top_n=TOP_TERMS):
+    months = review_months(df)
+    rows = []
+    for (store, month), group in df.groupby([df['Name'].astype(str), months], sort=False):
+        for word, count in Counter(column_tokens(group, 'Content')).most_common(top_n):
+            rows.append((store, month, word, count))
+    return _typed_terms(pd.DataFrame(rows, columns=MONTH_KEY + ['word', 'count']))
+
+
+class Rollups:
+    def __init__(self, months=None, terms=None, watermark=None):
+        empty = pd.DataFrame(columns=COUNT_COLUMNS + SENTIMENT_SUM_COLUMNS + SENTIMENT_N_COLUMNS,
+                             index=pd.MultiIndex.from_tuples([], names=MONTH_KEY), dtype=float)
+        self.months = empty if months is None else months
+        self.terms = _typed_terms(pd.DataFrame(columns=MONTH_KEY + ['word', 'count']) if terms is None else terms)
+        self.watermark = watermark  # latest Date folded in
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, df):
+        rollups = cls()
+        rollups.update(df)
+        return rollups
+
+    def update(self, df):
+        """Fold rows newer than the watermark into the rollups; returns the number of rows added."""
+        if self.watermark is not None:
+            df = df[pd.to_datetime(df['Date'], errors='coerce') > self.watermark]
+        return self.append(df)
+
+    def append(self, df):
+        """Fold all of ``df`` into the rollups; returns the number of rows added."""
+        if df.empty:
+            return 0
+        dates = pd.to_datetime(df['Date'], errors='coerce')
+        with self._lock, span("rollup_update") as s:
+            counts = _month_counts(df)
+            months = self.months.reindex(self.months.index.union(counts.index))
+            months[COUNT_COLUMNS] = months[COUNT_COLUMNS].fillna(0).add(
+                counts.reindex(months.index).fillna(0), fill_value=0)
+            self.months = months.sort_index()
+
+            # Top terms of a month are merged by summing counts, so months that
+            # arrive in several deltas keep an approximate top list.
+            terms = pd.concat([self.terms, _month_terms(df)], ignore_index=True)
+            terms = terms.groupby(MONTH_KEY + ['word'], observed=True, as_index=False)['count'].sum()
+            terms = terms.sort_values('count', ascending=False).groupby(MONTH_KEY, observed=True).head(TOP_TERMS)
+            self.terms = _typed_terms(terms.reset_index(drop=True))
+
+            latest = dates.max()
+            if pd.notna(latest):
+                self.watermark = latest if self.watermark is None else max(self.watermark, latest)
+            s.items = len(df)
+        return len(df)
+
+    def set_sentiment(self, store, df_store, column_scores):
+        """Replace the store's per-month sentiment sums with freshly computed per-text scores."""
+        review_month = review_months(df_store)
+        with self._lock:
+            months = self.months.copy()
+            store_rows = months.index.get_level_values('Name') == store
+            months.loc[store_rows, SENTIMENT_SUM_COLUMNS + SENTIMENT_N_COLUMNS] = np.nan
+            for col, scores in column_scores.items():
+                grouped = scores.groupby(review_month.reindex(scores.index)).agg(['sum', 'count'])
+                idx = pd.MultiIndex.from_product([[store], grouped.index], names=MONTH_KEY)
+                months = months.reindex(months.index.union(idx))
+                months.loc[idx, f"sent_sum_{col}"] = grouped['sum'].values
+                months.loc[idx, f"sent_n_{col}"] = grouped['count'].values
+            self.months = months.sort_index()
+
+    # --- reads ---
+    def store_months(self, store, start=None, end=None):
+        """Monthly rows of a store within [start, end] (``Period`` or string months)."""
+        if store not in self.months.index.get_level_values('Name'):
+            return self.months.iloc[0:0].droplevel('Name')
+        frame = self.months.xs(store, level='Name')
+        if start is not None:
+            frame = frame[frame.index >= pd.Period(start, 'M')]
+        if end is not None:
+            frame = frame[frame.index <= pd.Period(end, 'M')]
+        return frame
+
+    def trend(self, store, start=None, end=None):
+        """Per-month counts, average review length and sentiment (0-100) for charts."""
+        frame = self.store_months(store, start, end)
+        out = pd.DataFrame(index=frame.index)
+        out['reviews'] = frame['reviews'].fillna(0).astype(int)
+        out['images'] = frame['images'].fillna(0).astype(int)
+        out['avg_length'] = frame['content_chars'] / frame['reviews'].replace(0, np.nan)
+        for col in SENTIMENT_COLUMNS:
+            out[f"sentiment_{col}"] = frame[f"sent_sum_{col}"] / frame[f"sent_n_{col}"].replace(0, np.nan) * 100
+        return out
+
+    def window(self, store, start=None, end=None):
+        """Totals over a time window: counts, average length and sentiment per column."""
+        frame = self.store_months(store, start, end)
+        reviews = frame['reviews'].sum()
+        result = {
+            'reviews': int(reviews),
+            'images': int(frame['images'].sum()),
+            'avg_length': frame['content_chars'].sum() / reviews if reviews else 0.0,
+        }
+        for col in SENTIMENT_COLUMNS:
+            n = frame[f"sent_n_{col}"].sum()
+            result[f"sentiment_{col}"] = frame[f"sent_sum_{col}"].sum() / n * 100 if n else None
+        return result
+
+    def keyword_sentiment_by_store(self):
+        """All-time keyword sentiment (0-100) of every scored store, ``{store: {keyword: score or None}}``."""
+        sums = self.months[SENTIMENT_SUM_COLUMNS + SENTIMENT_N_COLUMNS].groupby(level='Name').sum(min_count=1)
+        scores = {}
+        for store, row in sums.iterrows():
+            keywords = {col: row[f"sent_sum_{col}"] / row[f"sent_n_{col}"] * 100 if row[f"sent_n_{col}"] > 0 else None
+                        for col in KEYWORD_COLUMNS_EN}
+            if any(v is not None for v in keywords.values()):
+                scores[store] = keywords
+        return scores
+
+    def top_terms(self, store, start=None, end=None, n=10):
+        terms = self.terms[self.terms['Name'] == store]
+        if start is not None:
+            terms = terms[terms['month'] >= pd.Period(start, 'M')]
+        if end is not None:
+            terms = terms[terms['month'] <= pd.Period(end, 'M')]
+        return terms.groupby('word')['count'].sum().nlargest(n)
+
+    # --- persistence ---
+    def save(self, path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        pd.to_pickle({'months': self.months, 'terms': self.terms, 'watermark': self.watermark}, tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        state = pd.read_pickle(path)
+        return cls(state['months'], state['terms'], state['watermark'])
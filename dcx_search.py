@@ -0,0 +1,195 @@
+"""Full-text inverted index over a region's reviews.
+
+Every review is indexed under the words of its ``Content`` and the cleaned
+morphemes of its ``Tokens``. The index is CSR-shaped: a sorted term array,
+``offsets`` into one ``int32`` postings array of row positions, and a per-row
+store code and date, so a term lookup is a binary search plus a slice and a
+store filter is one vectorized comparison. Phrases ("...") are answered by
+intersecting their terms' postings and then checking only the candidate
+rows' text. Built once per dataset and saved as a single ``.npz``; a refresh
+delta is tokenized on its own and merged in with ``extend``.
+"""
+import itertools
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from dcx_metrics import span
+
+WORD_RE = re.compile(r"\w+")
+QUERY_RE = re.compile(r'"([^"]+)"|(\S+)')
+BUILD_CHUNK = 200_000
+MAX_TERM_LENGTH = 24  # the term array is fixed-width, so one stray long token would widen every entry
+NAT = np.iinfo(np.int64).min
+
+
+def normalize(text):
+    return ' '.join(WORD_RE.findall(str(text).lower()))
+
+
+def parse_query(query):
+    """(terms, prefixes, phrases) of a query; ``word*`` is a prefix, ``"a b"`` a phrase."""
+    terms, prefixes, phrases = [], [], []
+    for phrase, word in QUERY_RE.findall(query):
+        if phrase:
+            words = normalize(phrase).split()
+            if len(words) > 1:
+                phrases.append(' '.join(words))
+            terms.extend(words)
+        elif word.endswith('*') and normalize(word):
+            prefixes.append(normalize(word))
+        else:
+            terms.extend(normalize(word).split())
+    return terms, prefixes, phrases
+
+
+def _row_terms(df):
+    content = df['Content'].fillna('').astype(str).str.lower().str.findall(WORD_RE)
+    tokens = df['Tokens'].fillna('').astype(str).str.lower().str.split()
+    return content + tokens
+
+
+class SearchIndex:
+    def __init__(self, terms, offsets, postings, store_codes, stores, dates, checksum=None):
+        self.terms = terms              # sorted unique terms
+        self.offsets = offsets          # postings of terms[i] are postings[offsets[i]:offsets[i + 1]]
+        self.postings = postings        # row positions, ascending within a term
+        self.store_codes = store_codes  # per row
+        self.stores = list(stores)
+        self.dates = dates              # per row, datetime64[ns] (NaT sorts last)
+        self.checksum = checksum
+        self._store_ids = {s: i for i, s in enumerate(self.stores)}
+
+    @classmethod
+    def build(cls, df, checksum=None):
+        with span("search_index_build") as s:
+            term_ids, rows, vocab = [], [], {}
+            for start in range(0, len(df), BUILD_CHUNK):
+                chunk = _row_terms(df.iloc[start:start + BUILD_CHUNK])
+                pairs = pd.DataFrame({'row': np.repeat(np.arange(start, start + len(chunk), dtype=np.int32),
+                                                       chunk.str.len().values),
+                                      'term': np.array(list(itertools.chain.from_iterable(chunk.values)), dtype=object)})
+                pairs = pairs[pairs['term'].str.len() <= MAX_TERM_LENGTH].drop_duplicates()
+                codes, uniques = pd.factorize(pairs['term'])
+                global_ids = np.fromiter((vocab.setdefault(t, len(vocab)) for t in uniques), dtype=np.int32,
+                                         count=len(uniques))
+                term_ids.append(global_ids[codes])
+                rows.append(pairs['row'].values.astype(np.int32))
+            term_ids = np.concatenate(term_ids) if term_ids else np.empty(0, np.int32)
+            rows = np.concatenate(rows) if rows else np.empty(0, np.int32)
+
+            # Renumber terms in sorted order so lookups are a binary search over one array
+            unsorted = np.array(list(vocab), dtype=object)
+            order = np.argsort(unsorted.astype(str), kind='stable')
+            rank = np.empty(len(order), dtype=np.int32)
+            rank[order] = np.arange(len(order), dtype=np.int32)
+            term_ids = rank[term_ids]
+            by_term = np.argsort(term_ids, kind='stable')  # rows stay ascending within a term
+            offsets = np.zeros(len(order) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(term_ids, minlength=len(order)), out=offsets[1:])
+
+            names = df['Name'].astype('category')
+            index = cls(unsorted[order].astype(str), offsets, rows[by_term], names.cat.codes.values.astype(np.int32),
+                        names.cat.categories.astype(str), pd.to_datetime(df['Date'], errors='coerce').values,
+                        checksum)
+            s.items = len(df)
+        return index
+
+    def extend(self, delta, checksum=None):
+        """Index with ``delta``'s rows appended after the indexed ones; only ``delta`` is tokenized.
+
+        Existing postings are copied block-wise to their term's new offset and
+        the delta's rows are placed after them, so rows stay ascending within
+        a term without re-sorting.
+        """
+        with span("search_index_extend") as s:
+            added = SearchIndex.build(delta)
+            terms = np.union1d(self.terms, added.terms)
+            old_ids = np.searchsorted(terms, self.terms)
+            new_ids = np.searchsorted(terms, added.terms)
+            old_counts, new_counts = np.diff(self.offsets), np.diff(added.offsets)
+            counts = np.zeros(len(terms), dtype=np.int64)
+            counts[old_ids] = old_counts
+            before_new = counts[new_ids]  # existing postings of the delta's terms
+            counts[new_ids] += new_counts
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+
+            postings = np.empty(offsets[-1], dtype=np.int32)
+            postings[np.arange(len(self.postings)) + np.repeat(offsets[old_ids] - self.offsets[:-1], old_counts)] = \
+                self.postings
+            postings[np.arange(len(added.postings)) +
+                     np.repeat(offsets[new_ids] + before_new - added.offsets[:-1], new_counts)] = \
+                added.postings + len(self)
+
+            stores = self.stores + [name for name in added.stores if name not in self._store_ids]
+            positions = {name: i for i, name in enumerate(stores)}
+            remap = np.array([positions[name] for name in added.stores] + [-1], dtype=np.int32)  # code -1 is a missing name
+            index = SearchIndex(terms, offsets, postings, np.concatenate([self.store_codes, remap[added.store_codes]]),
+                                stores, np.concatenate([self.dates, added.dates]), checksum)
+            s.items = len(delta)
+        return index
+
+    def __len__(self):
+        return len(self.store_codes)
+
+    # --- queries ---
+    def _term_rows(self, term):
+        i = np.searchsorted(self.terms, term)
+        if i < len(self.terms) and self.terms[i] == term:
+            return self.postings[self.offsets[i]:self.offsets[i + 1]]
+        return np.empty(0, dtype=np.int32)
+
+    def _prefix_rows(self, prefix):
+        lo = np.searchsorted(self.terms, prefix)
+        hi = np.searchsorted(self.terms, prefix + '\U0010ffff')
+        return np.unique(self.postings[self.offsets[lo]:self.offsets[hi]])
+
+    def search(self, query, store=None, texts=None):
+        """Row positions matching every term, prefix and phrase of ``query``, newest first.
+
+        ``texts(rows)`` returns the ``Content`` of candidate rows; it is needed
+        only for phrase queries.
+        """
+        terms, prefixes, phrases = parse_query(query)
+        if not (terms or prefixes) or (store is not None and store not in self._store_ids):
+            return np.empty(0, dtype=np.int32)  # an unknown store would otherwise match the NaN-name code -1
+        with span("search_query") as s:
+            postings = [self._term_rows(t) for t in dict.fromkeys(terms)]
+            postings += [self._prefix_rows(p) for p in prefixes]
+            postings.sort(key=len)  # intersect smallest first
+            rows = postings[0]
+            for other in postings[1:]:
+                if not len(rows):
+                    break
+                rows = np.intersect1d(rows, other, assume_unique=True)
+            if store is not None:
+                rows = rows[self.store_codes[rows] == self._store_ids[store]]
+            if phrases and len(rows):
+                content = pd.Series(texts(rows)).fillna('').astype(str).map(normalize)
+                keep = np.ones(len(rows), dtype=bool)
+                for phrase in phrases:
+                    keep &= (' ' + content + ' ').str.contains(' ' + phrase + ' ', regex=False).values
+                rows = rows[keep]
+            # Newest first; NaT dates go last
+            keys = self.dates[rows].astype('datetime64[ns]').view(np.int64)
+            keys = np.where(keys == NAT, NAT + 1, keys)
+            rows = rows[np.argsort(-keys, kind='stable')]
+            s.items = len(rows)
+        return rows
+
+    # --- persistence ---
+    def save(self, path):
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, terms=self.terms, offsets=self.offsets, postings=self.postings,
+                 store_codes=self.store_codes, stores=np.array(self.stores, dtype=str), dates=self.dates,
+                 checksum=np.array(self.checksum or ''))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['terms'], data['offsets'], data['postings'], data['store_codes'], data['stores'],
+                       data['dates'], str(data['checksum']) or None)
@@ -0,0 +1,150 @@
+"""Nearest-neighbour "similar stores" over per-store TF-IDF term profiles.
+
+Per-store term counts are kept between syncs; ``sync`` only re-tokenizes
+stores whose rows changed (by content fingerprint), and ``add`` only the
+appended rows. Both then rebuild the row-normalized TF-IDF matrix from the
+stored counts of every store: the IDF of a term changes with each store
+that starts using it, so the rebuild is O(stores + stored terms), a
+vectorized step that does not depend on the number of reviews. Queries are
+one sparse mat-vec plus ``argpartition``.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from dcx_core import KEYWORD_COLUMNS_EN, clean_token_column, stopwords, store_fingerprints
+from dcx_metrics import span
+
+
+class SimilarStores:
+    def __init__(self, min_df=2):
+        self.min_df = min_df
+        self.vocab = {}                 # term -> column
+        self._counts = {}               # store -> (columns, counts)
+        self._fingerprints = {}         # store -> content hash at last count
+        self.aspects = {}               # store -> keyword sentiment (0-100) vector, NaN when unscored
+        self.stores = []
+        self.matrix = None              # stores x vocab, L2-normalized TF-IDF
+        self._aspect_matrix = None
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def sync(self, df, fingerprints=None):
+        """Bring the index up to date with ``df``; returns the stores that were (re)counted.
+
+        ``fingerprints`` (``{store: hash}``, as ``Region`` keeps them) saves
+        hashing every row of ``df`` again.
+        """
+        with self._lock, span("similar_index_sync") as s:
+            fingerprints = dict(store_fingerprints(df) if fingerprints is None else fingerprints)
+            changed = [store for store, fp in fingerprints.items() if self._fingerprints.get(store) != fp]
+            removed = set(self._counts) - set(fingerprints)
+            for store in removed:
+                del self._counts[store]
+            if changed:
+                self._count_terms(df[df['Name'].astype(str).isin(changed)])
+            self._fingerprints = fingerprints
+            if changed or removed or self.matrix is None:
+                self._rebuild()
+            s.items = len(changed)
+        return changed
+
+    def add(self, delta, fingerprints):
+        """Fold appended rows into the counts; returns the stores that received any.
+
+        Only ``delta`` is tokenized: its counts are added to each store's
+        stored counts, then the matrix is rebuilt over all stores.
+        ``fingerprints`` are the stores' hashes after the append.
+        """
+        with self._lock, span("similar_index_add") as s:
+            stores = sorted(set(delta['Name'].astype(str)))
+            before = {store: self._counts.get(store) for store in stores}
+            self._count_terms(delta)
+            for store, old in before.items():
+                if old is not None and len(old[0]):
+                    cols, new_counts = self._counts[store]
+                    merged, inverse = np.unique(np.concatenate([old[0], cols]), return_inverse=True)
+                    counts = np.bincount(inverse, weights=np.concatenate([old[1], new_counts]))
+                    self._counts[store] = (merged.astype(np.int32), counts.astype(np.float32))
+                self._fingerprints[store] = fingerprints.get(store)
+            self._rebuild()
+            s.items = len(stores)
+        return stores
+
+    def _count_terms(self, df):
+        tokens = clean_token_column(df['Tokens'])
+        pairs = pd.DataFrame({'store': df['Name'].astype(str).values, 'term': tokens.values}).explode('term')
+        pairs = pairs[pairs['term'].notna() & ~pairs['term'].isin(stopwords) & (pairs['term'].str.len() > 1)]
+        counts = pairs.groupby(['store', 'term'], sort=False).size()
+        for store, store_counts in counts.groupby(level='store', sort=False):
+            terms = store_counts.index.get_level_values('term')
+            cols = np.fromiter((self.vocab.setdefault(t, len(self.vocab)) for t in terms), dtype=np.int32,
+                               count=len(terms))
+            self._counts[store] = (cols, store_counts.values.astype(np.float32))
+        for store in set(df['Name'].astype(str)) - set(counts.index.get_level_values('store')):
+            self._counts[store] = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+
+    def _rebuild(self):
+        self.stores = sorted(self._counts)
+        self._positions = {store: i for i, store in enumerate(self.stores)}
+        indptr = np.zeros(len(self.stores) + 1, dtype=np.int64)
+        cols, vals = [], []
+        for i, store in enumerate(self.stores):
+            c, v = self._counts[store]
+            cols.append(c)
+            vals.append(v)
+            indptr[i + 1] = indptr[i] + len(c)
+        counts = sparse.csr_matrix(
+            (np.concatenate(vals) if vals else np.empty(0), np.concatenate(cols) if cols else np.empty(0, int),
+             indptr), shape=(len(self.stores), len(self.vocab)))
+
+        doc_freq = np.bincount(counts.indices, minlength=len(self.vocab))
+        idf = np.log((1 + len(self.stores)) / (1 + doc_freq)) + 1
+        idf[doc_freq < self.min_df] = 0  # terms unique to one store say nothing about similarity
+        tfidf = counts.copy()
+        tfidf.data = (1 + np.log(tfidf.data)) * idf[tfidf.indices]
+        self.matrix = _normalize_rows(tfidf)
+        self._rebuild_aspects()
+
+    def set_aspect_scores(self, scores):
+        """Per-store keyword sentiment, ``{store: {keyword: score or None}}``, used for optional weighting."""
+        with self._lock:
+            for store, keywords in scores.items():
+                self.aspects[store] = np.array([np.nan if keywords.get(k) is None else keywords[k]
+                                                for k in KEYWORD_COLUMNS_EN], dtype=float)
+            self._rebuild_aspects()
+
+    def _rebuild_aspects(self):
+        A = np.full((len(self.stores), len(KEYWORD_COLUMNS_EN)), np.nan)
+        for store, vec in self.aspects.items():
+            if store in self._positions:
+                A[self._positions[store]] = vec
+        # Center on the region mean so "above/below average" drives the similarity
+        means = np.array([np.nanmean(col) if np.isfinite(col).any() else 0.0 for col in A.T])
+        A = np.nan_to_num(A - means)
+        norms = np.linalg.norm(A, axis=1, keepdims=True)
+        self._aspect_matrix = np.divide(A, norms, out=np.zeros_like(A), where=norms > 0)
+
+    def similar(self, store, k=5, sentiment_weight=0.0):
+        """Top-k (store, similarity) pairs, most similar first."""
+        i = self._positions.get(store)
+        if i is None or self.matrix is None or len(self.stores) < 2:
+            return []
+        with span("similar_query"):
+            scores = (self.matrix @ self.matrix[i].T).toarray().ravel()
+            if sentiment_weight > 0:
+                w2 = sentiment_weight ** 2
+                scores = (scores + w2 * (self._aspect_matrix @ self._aspect_matrix[i])) / (1 + w2)
+            scores[i] = -np.inf
+            k = min(k, len(self.stores) - 1)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+        return [(self.stores[j], float(scores[j])) for j in top if scores[j] > 0]
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags(1 / norms) @ matrix).tocsr()
@@ -0,0 +1,140 @@
+"""Synthetic review data for benchmarks and load tests.
+
+``generate_raw`` produces frames with the exact column layout of the region
+CSVs (Korean keyword columns), ``generate`` the frame ``read_dataset`` returns
+for them. Tokens are random Hangul syllable words with a Zipf distribution,
+store sizes follow a Zipf distribution controlled by ``skew``.
+"""
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from dcx_core import DATASET_COLUMNS, KEYWORD_COLUMNS_KO, AppendableFrame, normalize_delta, stopwords
+
+HANGUL_BASE = 0xAC00
+SEED_WORDS = ['맛있어요', '친절해요', '분위기', '가격', '위생', '깔끔해요', '주차', '웨이팅', '메뉴', '사장님',
+              '재방문', '양이', '서비스', '커피', '디저트', '고기', '국물', '매장', '직원', '추천']
+
+
+def _hangul_word(rng, min_syllables=1, max_syllables=3):
+    n = rng.integers(min_syllables, max_syllables + 1)
+    codes = HANGUL_BASE + (rng.integers(0, 19, n) * 21 + rng.integers(0, 21, n)) * 28 + rng.integers(0, 28, n)
+    return ''.join(map(chr, codes))
+
+
+def make_vocabulary(size, rng):
+    """Seed words, a few stopwords and random Hangul words, most frequent first."""
+    vocab = list(SEED_WORDS) + sorted(stopwords)[:20]
+    seen = set(vocab)
+    while len(vocab) < size:
+        word = _hangul_word(rng)
+        if word not in seen:
+            seen.add(word)
+            vocab.append(word)
+    return np.array(vocab[:size], dtype=object)
+
+
+def zipf_weights(n, exponent):
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def store_sizes(n_stores, n_reviews, skew=1.1, rng=None):
+    """Split ``n_reviews`` across stores with Zipf(``skew``) shares, at least one each."""
+    rng = rng or np.random.default_rng(0)
+    if n_stores == 1:
+        return np.array([n_reviews])
+    sizes = rng.multinomial(max(0, n_reviews - n_stores), zipf_weights(n_stores, skew)) + 1
+    return sizes
+
+
+def generate_raw(n_stores=20, n_reviews=10_000, skew=1.1, vocab_size=5_000, seed=0,
+                 start='2021-01-01', end='2024-12-31', image_rate=0.4, keyword_rate=0.3,
+                 store_prefix='가게'):
+    rng = np.random.default_rng(seed)
+    vocab = make_vocabulary(vocab_size, np.random.default_rng(0))
+    word_p = zipf_weights(len(vocab), 1.05)
+
+    sizes = store_sizes(n_stores, n_reviews, skew, rng)
+    names = np.repeat([f"{store_prefix} {i:05d}" for i in range(n_stores)], sizes)
+    n = len(names)
+
+    lengths = rng.poisson(12, n) + 3
+    words = rng.choice(vocab, size=lengths.sum(), p=word_p)
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    token_lists = [words[bounds[i]:bounds[i + 1]] for i in range(n)]
+
+    content = [' '.join(t[:len(t) // 2]) + '. ' + ' '.join(t[len(t) // 2:]) + '!' for t in token_lists]
+    sentences = [' '.join(t[:len(t) // 2]) + '.' for t in token_lists]
+    tokens = ["['" + "', '".join(t) + "']" for t in token_lists]
+
+    n_images = np.where(rng.random(n) < image_rate, rng.integers(1, 4, n), 0)
+    image_links = [
+        ', '.join(f"https://img.example.com/review/{rng.integers(1 << 48):012x}.jpg" for _ in range(k)) if k else np.nan
+        for k in n_images
+    ]
+
+    start_ts, end_ts = pd.Timestamp(start).value // 10**9, pd.Timestamp(end).value // 10**9
+    dates = pd.to_datetime(rng.integers(start_ts, end_ts, n), unit='s').strftime('%Y-%m-%d')
+
+    frame = {
+        'Name': names,
+        'Content': content,
+        'Tokens': tokens,
+        'Image_Links': image_links,
+    }
+    for col in KEYWORD_COLUMNS_KO:
+        has_snippet = rng.random(n) < keyword_rate
+        offsets = rng.integers(0, 3, n)
+        widths = rng.integers(2, 6, n)
+        frame[col] = [
+            ' '.join(t[o:o + w]) if keep else np.nan
+            for t, keep, o, w in zip(token_lists, has_snippet, offsets, widths)
+        ]
+    frame['review_sentences'] = sentences
+    frame['Date'] = dates
+    return pd.DataFrame(frame)[DATASET_COLUMNS]
+
+
+def generate(**kwargs):
+    """Synthetic rows as ``read_dataset`` returns them: normalized, Arrow-typed, ``Name`` categorical."""
+    return AppendableFrame(normalize_delta(generate_raw(**kwargs))).frame
+
+
+def write_csv(path, n_reviews, chunk_size=100_000, n_stores=200, skew=1.1, seed=0, **kwargs):
+    """Write a large region CSV chunk by chunk so the generator itself stays small."""
+    written = 0
+    chunk_id = 0
+    while written < n_reviews:
+        rows = min(chunk_size, n_reviews - written)
+        chunk = generate_raw(n_stores=min(n_stores, rows), n_reviews=rows, skew=skew,
+                             seed=seed + chunk_id, **kwargs)
+        chunk.to_csv(path, mode='w' if chunk_id == 0 else 'a', header=chunk_id == 0, index=False)
+        written += rows
+        chunk_id += 1
+    return path
+
+
+class StubClassifier:
+    """Deterministic stand-in for the transformers sentiment pipeline.
+
+    Accepts a string or a list of strings like the real pipeline; ``delay``
+    seconds per text simulate inference cost.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def _one(self, text):
+        h = zlib.crc32(str(text).encode('utf-8'))
+        score = 0.5 + (h % 5000) / 10000
+        return {'label': 'LABEL_1' if h % 4 else 'LABEL_0', 'score': score}
+
+    def __call__(self, texts, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        if self.delay:
+            time.sleep(self.delay * len(texts))
+        return [self._one(t) for t in texts]
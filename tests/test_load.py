@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from dcx_core import (DATASET_COLUMNS, DATASET_DTYPES, AppendableFrame, normalize_chunk, read_dataset,
+                      read_spilled)
+from dcx_synth import generate, generate_raw
+
+
+@pytest.fixture
+def region_csv(tmp_path):
+    path = str(tmp_path / 'region.csv')
+    generate_raw(n_stores=7, n_reviews=500, vocab_size=300, seed=0).to_csv(path, index=False)
+    return path
+
+
+def _single_pass(path):
+    df = normalize_chunk(pd.read_csv(path, usecols=DATASET_COLUMNS, dtype=DATASET_DTYPES))
+    df['Name'] = pd.Categorical(df['Name'], categories=pd.unique(df['Name']))
+    return df
+
+
+@pytest.mark.parametrize('chunksize', [1, 37, 500, 10_000])
+def test_chunked_load_matches_single_pass(region_csv, chunksize):
+    pd.testing.assert_frame_equal(read_dataset(region_csv, chunksize=chunksize), _single_pass(region_csv))
+
+
+def test_spilled_load_matches_single_pass(region_csv, tmp_path):
+    spill = read_dataset(region_csv, chunksize=37, spill_path=str(tmp_path / 'region.parquet'))
+    want = _single_pass(region_csv)
+    # Spilled stores come back with sorted categories
+    want['Name'] = want['Name'].cat.reorder_categories(want['Name'].cat.categories.sort_values())
+    pd.testing.assert_frame_equal(read_spilled(spill), want)
+
+    store = want['Name'].iloc[0]
+    part = want[want['Name'] == store].reset_index(drop=True)
+    got = read_spilled(spill, stores=[store])
+    pd.testing.assert_frame_equal(got.astype({'Name': str}), part.astype({'Name': str}))
+
+
+def test_append_matches_concat(region_csv):
+    df = _single_pass(region_csv)
+    parts = [df.iloc[:1], df.iloc[1:200], df.iloc[200:200], df.iloc[200:]]
+    frame = AppendableFrame()
+    seen = []
+    for part in parts:
+        frame.append(part.astype({'Name': DATASET_DTYPES['Name']}))
+        seen.append(frame.frame)
+    want = pd.concat(parts, ignore_index=True)
+    pd.testing.assert_frame_equal(frame.frame, want)
+    # A frame handed out earlier keeps its rows
+    head = want.iloc[:200].copy()
+    head['Name'] = head['Name'].cat.remove_unused_categories()
+    pd.testing.assert_frame_equal(seen[1], head)
+
+
+def test_synthetic_frame_matches_loaded_csv(tmp_path):
+    path = str(tmp_path / 'synth.csv')
+    generate_raw(n_stores=5, n_reviews=300, seed=4).to_csv(path, index=False)
+    pd.testing.assert_frame_equal(generate(n_stores=5, n_reviews=300, seed=4), read_dataset(path))
@@ -0,0 +1,92 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from dcx_core import disparity_backbone, network_metrics, reduce_network
+
+
+def _star(hub, strong, weak):
+    """``hub`` linked to ``strong`` (weight 100) and ten leaves (weight 1) on the ``weak`` prefix."""
+    G = nx.Graph()
+    G.add_edge(hub, strong, weight=100)
+    for i in range(10):
+        G.add_edge(hub, f"{weak}{i}", weight=1)
+    return G
+
+
+def _p_values(G):
+    # The disparity filter p-value of each edge, node by node
+    p = {}
+    for node in G:
+        k, s = G.degree(node), G.degree(node, weight='weight')
+        for other, data in G[node].items():
+            edge = frozenset((node, other))
+            value = (1 - data['weight'] / s) ** (k - 1) if k > 1 else 1.0
+            p[edge] = min(p.get(edge, 1.0), value)
+    return p
+
+
+def test_backbone_keeps_the_dominant_edge_of_each_star():
+    G = nx.compose(_star('a', 'b', 'x'), _star('c', 'd', 'y'))
+    G.add_edge('b', 'd', weight=3)
+    H = disparity_backbone(G)
+    assert {frozenset(e) for e in H.edges()} == {frozenset('ab'), frozenset('cd')}
+    assert H['a']['b']['weight'] == 100
+
+
+def test_backbone_matches_the_disparity_p_values():
+    rng = np.random.default_rng(0)
+    G = nx.gnm_random_graph(40, 160, seed=1)
+    for u, v in G.edges():
+        G[u][v]['weight'] = float(rng.pareto(1.5) + 1)
+    for alpha in [0.01, 0.05, 0.3]:
+        want = {edge for edge, p in _p_values(G).items() if p < alpha}
+        assert {frozenset(e) for e in disparity_backbone(G, alpha).edges()} == want
+
+
+def test_backbone_off_keeps_the_graph():
+    G = _star('a', 'b', 'x')
+    assert disparity_backbone(G, alpha=1) is G
+    assert disparity_backbone(nx.Graph()).number_of_edges() == 0
+
+
+def test_reduce_network_keeps_top_words_and_drops_isolates():
+    G = nx.compose(_star('a', 'b', 'x'), _star('c', 'd', 'y'))
+    word_freq = {'a': 50, 'b': 40, 'c': 30, 'x0': 20}
+    edges = G.number_of_edges()
+    H = reduce_network(G, word_freq, top_k=4)
+    assert {frozenset(e) for e in H.edges()} == {frozenset('ab')}
+    assert G.number_of_edges() == edges  # the input is left alone
+    assert set(reduce_network(G, word_freq, top_k=4, alpha=1).nodes()) == {'a', 'b', 'x0'}
+
+
+def _two_cliques():
+    G = nx.Graph()
+    for prefix in 'pq':
+        G.add_weighted_edges_from((f"{prefix}{i}", f"{prefix}{j}", 5) for i in range(8) for j in range(i))
+    G.add_edge('p0', 'q0', weight=1)
+    return G
+
+
+def test_network_metrics_exact_within_budget():
+    G = _two_cliques()
+    metrics, info = network_metrics(G, budget_seconds=60)
+    assert info['pagerank'] == 'pagerank'
+    assert info['communities'] == 'louvain'
+    assert info['betweenness'] == 'exact'
+    assert set(metrics.index) == set(G)
+    assert set(metrics['betweenness'].nlargest(2).index) == {'p0', 'q0'}
+    assert metrics['community'].nunique() == 2
+    assert metrics.groupby(metrics.index.str[0])['community'].nunique().tolist() == [1, 1]
+    assert metrics['betweenness'].to_dict() == pytest.approx(nx.betweenness_centrality(G))
+
+
+def test_network_metrics_falls_back_when_over_budget():
+    G = _two_cliques()
+    metrics, info = network_metrics(G, budget_seconds=0)
+    assert info['pagerank'] == 'degree'
+    assert info['communities'] == 'label_propagation'
+    assert info['betweenness'] == 'degree'
+    assert set(metrics.index) == set(G)
+    assert metrics['betweenness'].to_dict() == pytest.approx(nx.degree_centrality(G))
+    assert metrics['community'].notna().all()
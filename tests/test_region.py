@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dcx_core import DATASET_MAP, dataset_cache_path, read_dataset
+from dcx_region import Region
+from dcx_synth import generate_raw
+
+NAME = DATASET_MAP['Jeju Island']
+
+
+def _write(path, *frames):
+    pd.concat(frames, ignore_index=True).to_csv(path, index=False)
+
+
+def _region(directory, *frames):
+    """A region loaded from ``frames`` in ``directory``, with every index built."""
+    os.chdir(directory)
+    _write(dataset_cache_path(NAME), *frames)
+    region = Region(NAME)
+    region.catalog, region.similar, region.search, region.rollups
+    return region
+
+
+def _terms(df, n=8):
+    words = df['Tokens'].str.split().explode().value_counts()
+    return list(words.index[:n])
+
+
+def assert_same_region(region, fresh):
+    pd.testing.assert_frame_equal(region.df, fresh.df)
+    pd.testing.assert_frame_equal(read_dataset(region.path), fresh.df)
+    assert region.fingerprints == fresh.fingerprints
+
+    stores = list(fresh.df['Name'].cat.categories)
+    for query in ['', '가게', '새가게', '가게 0001', 'ㄱ', '개가 00003']:
+        assert region.catalog.search(query, limit=50) == fresh.catalog.search(query, limit=50)
+    assert [region.catalog.info(s) for s in stores] == [fresh.catalog.info(s) for s in stores]
+
+    for term in _terms(fresh.df):
+        for store in [None] + stores[:3]:
+            np.testing.assert_array_equal(region.search.search(term, store=store),
+                                          fresh.search.search(term, store=store))
+
+    for store in stores:
+        got, want = region.similar.similar(store, k=3), fresh.similar.similar(store, k=3)
+        assert [s for s, _ in got] == [s for s, _ in want]
+        assert [score for _, score in got] == pytest.approx([score for _, score in want], abs=1e-5)
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    cwd = os.getcwd()
+    yield tmp_path
+    os.chdir(cwd)
+
+
+def test_refresh_from_full_export_matches_fresh_load(workdir):
+    base = generate_raw(n_stores=6, n_reviews=300, vocab_size=300, seed=0)
+    new = pd.concat([generate_raw(n_stores=4, n_reviews=60, vocab_size=300, seed=1),
+                     generate_raw(n_stores=2, n_reviews=20, vocab_size=300, seed=2, store_prefix='새가게')],
+                    ignore_index=True)
+    (workdir / 'live').mkdir()
+    (workdir / 'fresh').mkdir()
+    region = _region(workdir / 'live', base)
+    export = str(workdir / 'export.csv')
+    _write(export, base, new)
+
+    changed = region.refresh(export)
+    assert changed == sorted(set(new['Name']))
+    assert region.refresh(export) == []  # nothing past the loaded rows
+    assert len(region.df) == len(base) + len(new)
+
+    assert_same_region(region, _region(workdir / 'fresh', base, new))
+
+
+def test_refresh_by_date_keeps_new_same_day_reviews(workdir):
+    base = generate_raw(n_stores=6, n_reviews=300, vocab_size=300, seed=0, start='2024-01-01', end='2024-06-30')
+    base.loc[base.index[::25], 'Date'] = '2024-06-30'  # the latest day, a few reviews per store
+    loaded_that_day = base[base['Date'] == '2024-06-30']
+    same_day = generate_raw(n_stores=3, n_reviews=30, vocab_size=300, seed=1, start='2024-06-30', end='2024-07-01')
+    same_day = pd.concat([same_day, same_day.iloc[:2]], ignore_index=True)  # genuine duplicates are kept
+    later = generate_raw(n_stores=2, n_reviews=20, vocab_size=300, seed=2, start='2024-07-01', end='2024-07-31',
+                         store_prefix='새가게')
+    older = base[base['Date'] < '2024-06-30'].iloc[:10]
+    delta = pd.concat([older, loaded_that_day, same_day, later], ignore_index=True)
+
+    (workdir / 'live').mkdir()
+    (workdir / 'fresh').mkdir()
+    region = _region(workdir / 'live', base)
+    delta_path = str(workdir / 'delta.csv')
+    _write(delta_path, delta)
+
+    region.refresh(delta_path, by_date=True)
+    assert len(region.df) == len(base) + len(same_day) + len(later)
+    assert region.refresh(delta_path, by_date=True) == []  # every row is already loaded
+    assert len(region.df) == len(base) + len(same_day) + len(later)
+
+    assert_same_region(region, _region(workdir / 'fresh', base, same_day, later))
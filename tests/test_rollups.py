@@ -0,0 +1,23 @@
+import pandas as pd
+
+from dcx_rollups import Rollups
+
+
+def _reviews(rows):
+    return pd.DataFrame(rows, columns=['Name', 'Date', 'Content', 'Image_Links'])
+
+
+def test_top_terms_after_append():
+    rollups = Rollups()
+    rollups.append(_reviews([
+        ('가게1', '2024-01-05', '커피 맛 커피', None),
+        ('가게1', '2024-02-10', '커피 빵', None),
+        ('가게2', '2024-02-11', '국수', None),
+    ]))
+    rollups.append(_reviews([('가게1', '2024-02-20', '빵 빵', None)]))
+
+    assert rollups.terms['count'].dtype == 'int64'
+    top = rollups.top_terms('가게1', n=2)
+    assert top.to_dict() == {'커피': 3, '빵': 3}
+    assert rollups.top_terms('가게1', start='2024-02', n=1).to_dict() == {'빵': 3}
+    assert rollups.top_terms('없는 가게').empty
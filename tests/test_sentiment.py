@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from dcx_core import (Z_95, SENTIMENT_COLUMNS, SentimentSampler, score_texts, sentiment_inputs,
+                      store_sentiment, stratified_order, summarize_sentiment)
+from dcx_synth import StubClassifier, generate
+
+
+def _store(n_reviews=600, seed=0, **kwargs):
+    return generate(n_stores=1, n_reviews=n_reviews, vocab_size=400, seed=seed, **kwargs)
+
+
+def test_stratified_order_prefixes_are_proportional():
+    sizes = [500, 300, 150, 50]
+    strata = np.repeat(np.arange(len(sizes)), sizes)
+    order = stratified_order(strata, seed=3)
+    assert sorted(order) == list(range(len(strata)))
+    for n in [10, 64, 128, 333, 1000]:
+        counts = np.bincount(strata[order[:n]], minlength=len(sizes))
+        assert np.all(np.abs(counts - n * np.array(sizes) / len(strata)) <= 1)
+
+
+def test_estimate_of_single_stratum_is_sample_mean_with_fpc():
+    df = _store(start='2024-03-01', end='2024-03-31')
+    sampler = SentimentSampler(df)
+    sampler.refine(StubClassifier())
+    col = 'review_sentences'
+    n, N = sampler.scored[col], len(sampler.texts[col])
+    picked = sampler.scores[col][sampler.order[col][:n]]
+    est, half = sampler.estimate(col)
+    assert 0 < n < N
+    assert est == pytest.approx(picked.mean() * 100)
+    assert half == pytest.approx(Z_95 * np.sqrt((1 - n / N) * picked.var(ddof=1) / n) * 100)
+
+
+def test_intervals_cover_the_exact_score():
+    df = _store(n_reviews=1500)
+    clf = StubClassifier()
+    exact = np.mean(score_texts(list(sentiment_inputs(df)['review_sentences']), clf)) * 100
+    covered = 0
+    for seed in range(100):
+        sampler = SentimentSampler(df, seed=seed)
+        sampler.refine(clf)
+        est, half = sampler.estimate('review_sentences')
+        covered += abs(est - exact) <= half
+    assert covered >= 85
+
+
+@pytest.mark.parametrize('target', [None, 2.0])
+def test_refined_to_completion_matches_exact_scoring(target):
+    df = _store()
+    clf = StubClassifier()
+    sampler = SentimentSampler(df)
+    if target is not None:
+        while not sampler.converged(target):
+            assert sampler.refine(clf, target) > 0
+    while sampler.refine(clf):
+        pass
+    assert sampler.complete()
+
+    column_scores = sampler.column_scores()
+    for col, texts in sentiment_inputs(df).items():
+        np.testing.assert_allclose(column_scores[col].values, score_texts(list(texts), clf))
+        assert column_scores[col].index.equals(texts.index)
+    got, want = summarize_sentiment(column_scores), store_sentiment(df, clf)
+    assert got['total'] == pytest.approx(want['total'])
+    assert got['keywords'] == pytest.approx(want['keywords'])
+    for col in SENTIMENT_COLUMNS:
+        assert sampler.estimate(col)[1] == 0.0